@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Adaptive Dormand-Prince vs fixed-step RK4
+Compares step counts, wall time and spike times for HH and HR neurons
+"""
+import time as timer
+
+import neun_py
+import numpy as np
+
+from neun_tools import (
+    HR_INITIAL,
+    HR_PARAMS,
+    create_hh_neuron,
+    run_spikes,
+    set_params,
+    set_state,
+    solve_adaptive,
+)
+
+
+def create_hr_neuron():
+    neuron = neun_py.HRDoubleRK4(neun_py.HRDoubleConstructorArgs())
+    set_params(neuron, HR_PARAMS)
+    set_state(neuron, HR_INITIAL)
+    return neuron
+
+
+experiments = [
+    # name, model, neuron factory, I_ext, dt, duration
+    ('HH', 'HH', create_hh_neuron, 0.1, 0.001, 100),
+    ('HR bursting', 'HR', create_hr_neuron, 2.5, 0.01, 1000),
+]
+
+for name, model, factory, I_ext, dt, T in experiments:
+    n_steps = int(round(T / dt))
+
+    start = timer.perf_counter()
+    # The state after step k is at time (k + 1) * dt
+    spikes_rk4 = run_spikes(factory(), dt, n_steps, I_ext, interpolate=True) + dt
+    t_rk4 = timer.perf_counter() - start
+
+    for rtol in [1e-4, 1e-6, 1e-8]:
+        start = timer.perf_counter()
+        sol = solve_adaptive(model, T, I_ext, rtol=rtol, atol=rtol * 1e-2)
+        t_adaptive = timer.perf_counter() - start
+
+        n = min(len(sol.spike_times), len(spikes_rk4))
+        error = np.max(np.abs(sol.spike_times[:n] - spikes_rk4[:n])) if n else np.nan
+        print(f"{name} rtol={rtol:.0e}: {sol.n_steps:7d} steps ({n_steps} fixed), "
+              f"{t_adaptive:6.2f} s ({t_rk4:6.2f} s fixed), "
+              f"spikes {len(sol.spike_times)}/{len(spikes_rk4)}, "
+              f"max spike-time error {error:.2e}")
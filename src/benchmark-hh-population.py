@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Benchmark: HHPopulation vs one HHDoubleRK4 per grid point
+Runs the gNa x gK grid of parameter-exploration-batch.py both ways
+and reports wall time and the largest voltage difference, failing if
+it exceeds the stated tolerance
+"""
+import itertools
+import sys
+import time as timer
+
+import neun_py
+import numpy as np
+
+from neun_tools import HH_INITIAL, HH_PARAMS, HHPopulation, run, set_params, set_state
+
+dt = 0.001
+T = 100
+n_steps = int(round(T / dt))
+I_ext = 0.1
+tolerance = 1e-6  # mV, largest accepted |V_population - V_HHDoubleRK4|
+
+# Same grid as src/parameter-exploration-batch.py
+grid = list(itertools.product([100, 120, 140], [30, 36, 42]))
+gna = np.array([g for g, _ in grid]) * 7.854e-3
+gk = np.array([g for _, g in grid]) * 7.854e-3
+
+# Reference: one neun_py neuron per grid point
+start = timer.perf_counter()
+V_ref = np.empty((n_steps, len(grid)))
+for i in range(len(grid)):
+    neuron = neun_py.HHDoubleRK4(neun_py.HHDoubleConstructorArgs())
+    set_params(neuron, {**HH_PARAMS, 'gna': gna[i], 'gk': gk[i]})
+    set_state(neuron, HH_INITIAL)
+    V_ref[:, i] = run(neuron, dt, n_steps, I_ext)
+t_ref = timer.perf_counter() - start
+
+# Vectorized population
+start = timer.perf_counter()
+pop = HHPopulation(len(grid), params={'gna': gna, 'gk': gk})
+V_pop = pop.run(dt, n_steps, I_ext)
+t_pop = timer.perf_counter() - start
+
+print(f"Grid points: {len(grid)}, steps: {n_steps}")
+print(f"  {'HHDoubleRK4 x ' + str(len(grid)) + ':':18s} {t_ref:8.2f} s")
+print(f"  {'HHPopulation:':18s} {t_pop:8.2f} s")
+print(f"  {'Speed-up:':18s} {t_ref / t_pop:8.2f}x")
+max_error = np.max(np.abs(V_ref - V_pop))
+print(f"  {'Max |ΔV|:':18s} {max_error:.3e} mV "
+      f"({'within' if max_error <= tolerance else 'OUTSIDE'} the {tolerance:g} mV tolerance)")
+if max_error > tolerance:
+    sys.exit(f"HHPopulation differs from HHDoubleRK4 by {max_error:.3e} mV "
+             f"(tolerance {tolerance:g} mV)")
+
+# Cost per step as the population grows
+print("\nHHPopulation cost per step:")
+for size in [1, 9, 100, 1000, 10000]:
+    pop = HHPopulation(size)
+    start = timer.perf_counter()
+    pop.run(dt, 1000, I_ext, every=1000)
+    elapsed = (timer.perf_counter() - start) / 1000
+    print(f"  N = {size:6d}: {elapsed * 1e6:8.1f} us/step ({elapsed / size * 1e9:8.1f} ns/neuron/step)")
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-step Python loop vs neun_tools.run
+Simulates the same HH neuron both ways and compares time and traces
+"""
+import time as timer
+
+import neun_py
+import numpy as np
+
+from neun_tools import create_hh_neuron, run
+
+dt = 0.001
+T = 100
+n_steps = int(round(T / dt))
+I_ext = 0.1 + 0.01 * np.random.default_rng(42).standard_normal(n_steps)
+n_repeats = 5
+
+
+def loop_version():
+    neuron = create_hh_neuron()
+    V = []
+    for k in range(n_steps):
+        neuron.add_synaptic_input(I_ext[k])
+        neuron.step(dt)
+        V.append(neuron.get(neun_py.HHDoubleVariable.v))
+    return np.array(V)
+
+
+def run_version():
+    return run(create_hh_neuron(), dt, n_steps, I_ext)
+
+
+def best_time(fn):
+    """Best wall time over n_repeats calls, and the last result"""
+    times = []
+    for _ in range(n_repeats):
+        start = timer.perf_counter()
+        result = fn()
+        times.append(timer.perf_counter() - start)
+    return min(times), result
+
+
+t_loop, V_loop = best_time(loop_version)
+t_run, V_run = best_time(run_version)
+
+print(f"Steps per simulation: {n_steps}")
+print(f"  Python loop:      {t_loop * 1e3:8.1f} ms")
+print(f"  neun_tools.run:   {t_run * 1e3:8.1f} ms")
+print(f"  Speed-up:         {t_loop / t_run:8.2f}x")
+print(f"  Max |ΔV|:         {np.max(np.abs(V_loop - V_run)):.3e} mV")
@@ -7,6 +7,8 @@ import neun_py
 import matplotlib.pyplot as plt
 import numpy as np
 
+from neun_tools import SimulationCache, simulation_key
+
 def create_hh_neuron(v_init=-65):
     """Create and initialize an HH neuron"""
     neuron_args = neun_py.HHDoubleConstructorArgs()
@@ -62,6 +64,17 @@ def run_simulation(coupling_conductance):
     
     return np.array(v1_vals), np.array(v2_vals)
 
+# The sweep and the example traces share results through the on-disk cache
+cache = SimulationCache()
+
+def cached_simulation(coupling_conductance):
+    """run_simulation(), computed once per conductance across runs of the script"""
+    key = simulation_key('HHDoubleRK4+ESynHHHHDoubleRK4', {'g': coupling_conductance},
+                         {'v1': -75, 'v2': -65}, 0.001, 100000, [0.1, 0.08])
+    traces = cache.get_or_compute(
+        key, lambda: dict(zip(('v1', 'v2'), run_simulation(coupling_conductance))))
+    return traces['v1'], traces['v2']
+
 def compute_synchronization(v1, v2):
     """Compute correlation coefficient as measure of synchronization"""
     return np.corrcoef(v1, v2)[0, 1]
@@ -72,7 +85,7 @@ sync_values = []
 
 print("Computing synchronization for different coupling strengths...")
 for g in conductances:
-    v1, v2 = run_simulation(g)
+    v1, v2 = cached_simulation(g)
     sync = compute_synchronization(v1, v2)
     sync_values.append(sync)
     print(f"  g = {g:.4f}: sync = {sync:.3f}")
@@ -86,7 +99,7 @@ example_labels = ['Weak', 'Medium', 'Strong']
 colors = ['red', 'orange', 'green']
 
 for i, (g, label, color) in enumerate(zip(example_conductances, example_labels, colors)):
-    v1, v2 = run_simulation(g)
+    v1, v2 = cached_simulation(g)
     times = np.arange(len(v1)) * 0.001
     
     ax = ax1 if i == 0 else (ax2 if i == 1 else ax3)
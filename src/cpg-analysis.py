@@ -7,6 +7,8 @@ import neun_py
 import matplotlib.pyplot as plt
 import numpy as np
 
+from neun_tools import detect_bursts, phase_lags
+
 def create_hr_neuron(I_ext=3.0, ini_x=0):
     """Create Hindmarsh-Rose neuron (good for rhythmic activity)"""
     neuron_args = neun_py.HRDoubleConstructorArgs()
@@ -73,43 +75,18 @@ plt.plot(times, x1_values, 'b-', label='Neuron 1')
 plt.plot(times, x2_values, 'r-', label='Neuron 2')
 plt.legend()
 plt.show()
-# Detect burst peaks (local maxima above threshold)
-def detect_bursts(signal, threshold=0):
-    bursts = []
-    for i in range(1, len(signal)-1):
-        if signal[i] > threshold and signal[i] > signal[i-1] and signal[i] > signal[i+1]:
-            bursts.append(i)
-    return np.array(bursts)
-
-bursts1 = detect_bursts(x1_values, threshold=1.0)
-bursts2 = detect_bursts(x2_values, threshold=1.0)
-
-# Compute inter-burst intervals (IBIs)
-def compute_ibis(burst_indices, times):
-    if len(burst_indices) < 2:
-        return np.array([])
-    burst_times = times[burst_indices]
-    return np.diff(burst_times)
-
-ibi1 = compute_ibis(bursts1, times)
-ibi2 = compute_ibis(bursts2, times)
-
-# Compute phase difference (time lag between bursts)
-def compute_phase_lag(bursts1, bursts2, times):
-    if len(bursts1) == 0 or len(bursts2) == 0:
-        return []
-    
-    phase_lags = []
-    for b1 in bursts1:
-        # Find nearest burst in neuron 2
-        if len(bursts2) > 0:
-            nearest = bursts2[np.argmin(np.abs(bursts2 - b1))]
-            lag = times[nearest] - times[b1]
-            phase_lags.append(lag)
-    
-    return np.array(phase_lags)
+# Segment bursts: a burst starts when x rises above 0 and ends when it
+# falls below -1.2; shorter silences than 5 ms are troughs between spikes
+bursts = detect_bursts(np.stack([x1_values, x2_values]), step, on=0.0, off=-1.2, min_gap=5)
+bursts1 = bursts.onsets[bursts.of(0)]
+bursts2 = bursts.onsets[bursts.of(1)]
+
+# Inter-burst intervals (onset to onset)
+ibi1 = bursts.periods[bursts.of(0)][:-1]
+ibi2 = bursts.periods[bursts.of(1)][:-1]
 
-phase_lags = compute_phase_lag(bursts1, bursts2, times)
+# Phase difference: lag from each neuron 1 burst to the nearest neuron 2 burst
+lags = phase_lags(bursts, 0, 1)['lag']
 
 # Visualization
 fig = plt.figure(figsize=(14, 10))
@@ -150,10 +127,10 @@ ax3.grid(True, alpha=0.3)
 
 # Phase relationship
 ax4 = plt.subplot(3, 2, 5)
-if len(phase_lags) > 0:
-    ax4.hist(phase_lags, bins=20, color='purple', alpha=0.7, edgecolor='black')
-    ax4.axvline(np.mean(phase_lags), color='red', linestyle='--', 
-                linewidth=2, label=f'Mean: {np.mean(phase_lags):.1f} ms')
+if len(lags) > 0:
+    ax4.hist(lags, bins=20, color='purple', alpha=0.7, edgecolor='black')
+    ax4.axvline(np.mean(lags), color='red', linestyle='--', 
+                linewidth=2, label=f'Mean: {np.mean(lags):.1f} ms')
 ax4.set_xlabel('Phase Lag (ms)')
 ax4.set_ylabel('Count')
 ax4.set_title('Phase Relationship Between Neurons')
@@ -186,5 +163,6 @@ if len(ibi1) > 0:
     print(f"  Mean IBI Neuron 1: {np.mean(ibi1):.2f} ± {np.std(ibi1):.2f} ms")
 if len(ibi2) > 0:
     print(f"  Mean IBI Neuron 2: {np.mean(ibi2):.2f} ± {np.std(ibi2):.2f} ms")
-if len(phase_lags) > 0:
-    print(f"  Mean phase lag: {np.mean(phase_lags):.2f} ± {np.std(phase_lags):.2f} ms")
+if len(lags) > 0:
+    print(f"  Mean phase lag: {np.mean(lags):.2f} ± {np.std(lags):.2f} ms")
+print(bursts.statistics())
@@ -2,6 +2,8 @@ import neun_py
 import numpy as np
 import matplotlib.pyplot as plt
 
+from neun_tools import HR_INITIAL, HR_PARAMS, SimulationCache, detect_spikes, simulation_key
+
 # ---------------------------------------------------------
 # Simulation parameters
 # ---------------------------------------------------------
@@ -47,26 +49,13 @@ def simulate_HR(I_array):
 
     return np.array(V_trace)
 
-# ---------------------------------------------------------
-# Peak-based Spike Detection (for HR model)
-# ---------------------------------------------------------
-def compute_ISI_stats_HR(V, threshold=0.0):
-    """Detect spikes as local maxima in the HR x-variable."""
-    spike_times = []
-
-    for i in range(1, len(V)-1):
-        if V[i] > threshold and V[i] > V[i-1] and V[i] > V[i+1]:
-            # Avoid double-counting
-            if len(spike_times) == 0 or (i*dt - spike_times[-1]) > 5:
-                spike_times.append(i * dt)
-
-    if len(spike_times) < 2:
-        return None, None
-
-    ISIs = np.diff(spike_times)
-    CV = np.std(ISIs) / np.mean(ISIs)
+# Traces are stored in the neun_tools cache, keyed by everything that defines
+# them, so re-running the script (or the other HR scripts) reuses them
+cache = SimulationCache()
 
-    return ISIs, CV
+def simulate_HR_cached(I_array):
+    key = simulation_key(neun_py.HRDoubleRK4, HR_PARAMS, HR_INITIAL, dt, n_steps, I_array)
+    return cache.get_or_compute(key, lambda: simulate_HR(I_array))['data']
 
 # ---------------------------------------------------------
 # Generate currents
@@ -85,16 +74,19 @@ I_chaotic_array = np.ones(n_steps) * I_chaotic
 # ---------------------------------------------------------
 # Simulations
 # ---------------------------------------------------------
-V_clean = simulate_HR(I_clean)
-V_noisy = simulate_HR(I_noisy)
-V_chaotic = simulate_HR(I_chaotic_array)
+V_clean = simulate_HR_cached(I_clean)
+V_noisy = simulate_HR_cached(I_noisy)
+V_chaotic = simulate_HR_cached(I_chaotic_array)
 
 # ---------------------------------------------------------
 # Compute ISI statistics
 # ---------------------------------------------------------
-ISIs_clean, CV_clean = compute_ISI_stats_HR(V_clean)
-ISIs_noisy, CV_noisy = compute_ISI_stats_HR(V_noisy)
-ISIs_ch, CV_ch = compute_ISI_stats_HR(V_chaotic)
+# Spikes are local maxima of the HR x-variable above 0, merged within 5
+# time units to avoid double-counting. All traces are analysed at once.
+spikes = detect_spikes(np.stack([V_clean, V_noisy, V_chaotic]), dt,
+                       threshold=0.0, refractory=5)
+ISIs_clean, ISIs_noisy, ISIs_ch = spikes.isis
+CV_clean, CV_noisy, CV_ch = spikes.cv
 
 print("\n--- CV VALUES ---")
 print(f"HR Regular (clean):   CV = {CV_clean:.3f}")
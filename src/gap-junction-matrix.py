@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+All-to-all gap-junction network with one conductance matrix
+Same network as population-rate.py, checked against the ESyn version
+"""
+import neun_py
+import numpy as np
+
+from neun_tools import GapJunctions, HHPopulation, create_hh_neuron
+
+n_neurons = 10
+coupling_strength = -0.0005
+step = 0.001  # ms
+duration = 50  # ms
+n_steps = int(round(duration / step))
+
+rng = np.random.default_rng(42)
+v_init = -65 + rng.standard_normal(n_neurons) * 3
+initial = {'m': 0.05, 'h': 0.6, 'n': 0.3}
+I_ext = 0.10 + rng.standard_normal((n_steps, n_neurons)) * 0.01
+
+# Reference: one ESyn object per pair
+neurons = [create_hh_neuron(initial={**initial, 'v': v}) for v in v_init]
+synapses = [
+    neun_py.ESynHHHHDoubleRK4(neurons[i], neun_py.HHDoubleVariable.v,
+                              neurons[j], neun_py.HHDoubleVariable.v,
+                              coupling_strength, coupling_strength)
+    for i in range(n_neurons) for j in range(i + 1, n_neurons)
+]
+V_esyn = np.empty((n_steps, n_neurons))
+for k in range(n_steps):
+    for synapse in synapses:
+        synapse.step(step)
+    for i, neuron in enumerate(neurons):
+        neuron.add_synaptic_input(I_ext[k, i])
+        neuron.step(step)
+        V_esyn[k, i] = neuron.get(neun_py.HHDoubleVariable.v)
+
+# Same coupling as a matrix: G[i, j] = g for every i != j
+G = np.full((n_neurons, n_neurons), coupling_strength)
+np.fill_diagonal(G, 0.0)
+
+# 1) Matrix coupling on the same neun_py neurons
+neurons = [create_hh_neuron(initial={**initial, 'v': v}) for v in v_init]
+gap = GapJunctions(neurons, G)
+V_matrix = np.empty((n_steps, n_neurons))
+for k in range(n_steps):
+    gap.step(step)
+    for i, neuron in enumerate(neurons):
+        neuron.add_synaptic_input(I_ext[k, i])
+        neuron.step(step)
+        V_matrix[k, i] = neuron.get(neun_py.HHDoubleVariable.v)
+
+# 2) Matrix coupling on a vectorized population
+pop = HHPopulation(n_neurons, initial={**initial, 'v': v_init})
+gap = GapJunctions(pop, G)
+V_pop = np.empty((n_steps, n_neurons))
+for k in range(n_steps):
+    gap.step(step)
+    pop.add_synaptic_input(I_ext[k])
+    pop.step(step)
+    V_pop[k] = pop.get('v')
+
+print(f"ESyn objects: {len(synapses)}, matrix non-zeros: {np.count_nonzero(G)}")
+print(f"Max |ΔV| ESyn vs matrix (neun_py):    {np.max(np.abs(V_esyn - V_matrix)):.3e} mV")
+print(f"Max |ΔV| ESyn vs matrix (population): {np.max(np.abs(V_esyn - V_pop)):.3e} mV")
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Heterogeneous population
+10,000 Izhikevich neurons with parameters drawn from distributions
+(the heterogeneous network of advanced-topics.qmd), simulated together
+and compared with the cost of one neun_py neuron
+"""
+import time
+
+import neun_py
+import numpy as np
+
+from neun_tools import Gamma, Normal, Population, set_params, set_state
+
+n_neurons = 10000
+dt = 0.1  # ms
+T = 500  # ms
+n_steps = int(T / dt)
+I_ext = 10.0
+
+# Izhikevich (2003) cortical cells: c and d vary from regular spiking
+# towards chattering with r^2, r uniform in [0, 1)
+params = {
+    'a': Gamma(shape=25, scale=0.02 / 25),
+    'b': Normal(0.2, 0.01),
+    'c': lambda rng, n: -65 + 15 * rng.random(n)**2,
+    'd': lambda rng, n: 8 - 6 * rng.random(n)**2,
+}
+
+start = time.perf_counter()
+pop = Population('Iz', n_neurons, params=params, seed=42)
+spikes = pop.run_spikes(dt, n_steps, I_ext=I_ext)
+population_time = time.perf_counter() - start
+
+# The same protocol for a single neun_py neuron
+neuron = neun_py.IzDoubleRK4(neun_py.IzDoubleConstructorArgs())
+set_params(neuron, {'a': 0.02, 'b': 0.2, 'c': -65.0, 'd': 8.0})
+set_state(neuron, {'v': -65.0, 'u': 0.2 * -65.0})
+start = time.perf_counter()
+for _ in range(n_steps):
+    neuron.add_synaptic_input(I_ext)
+    neuron.step(dt)
+neuron_time = time.perf_counter() - start
+
+firing_rates = 1000 * spikes.rate  # Hz
+print(f"{n_neurons} neurons: {population_time:.2f} s, "
+      f"one neun_py neuron: {neuron_time:.2f} s")
+print(f"{len(spikes.rows)} spikes, raster of {spikes.rows.nbytes + spikes.indices.nbytes} bytes")
+print(f"Firing rate: {np.mean(firing_rates):.1f} +/- {np.std(firing_rates):.1f} Hz "
+      f"(range {np.min(firing_rates):.1f}-{np.max(firing_rates):.1f} Hz)")
+print(f"Mean CV of ISIs: {np.nanmean(spikes.cv):.3f}")
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Microcircuit connectivity
+The six populations and connection probabilities of the cortical
+microcircuit in advanced-topics.qmd, scaled up 50x and drawn into one
+network-wide CSR array with weights and delays
+"""
+import time
+
+import numpy as np
+
+from neun_tools import FixedProbability, Normal, connect, merge, stream_generators
+
+scale = 50
+layer_sizes = {
+    'L2/3_E': 40 * scale,
+    'L2/3_I': 10 * scale,
+    'L4_E': 30 * scale,
+    'L4_I': 8 * scale,
+    'L5_E': 35 * scale,
+    'L5_I': 9 * scale,
+}
+
+# Connection probabilities (simplified from Potjans & Diesmann, 2014)
+connections = [
+    ('L4_E', 'L2/3_E', 0.15),
+    ('L4_E', 'L2/3_I', 0.10),
+    ('L2/3_E', 'L5_E', 0.05),
+    ('L2/3_I', 'L2/3_E', 0.20),
+    ('L4_I', 'L4_E', 0.25),
+    ('L5_I', 'L5_E', 0.20),
+]
+
+offsets = dict(zip(layer_sizes, np.cumsum([0] + list(layer_sizes.values()))))
+n_neurons = sum(layer_sizes.values())
+
+
+def positive(distribution, minimum):
+    """Values of a distribution, clipped from below"""
+    return lambda rng, n: np.maximum(distribution(rng, n), minimum)
+
+
+start = time.perf_counter()
+# One random stream per projection: each projection is reproducible on its own
+rngs = stream_generators(42, range(len(connections)))
+parts = []
+for rng, (pre_name, post_name, p_conn) in zip(rngs, connections):
+    if 'I' in pre_name:
+        weight, delay = Normal(0.05, 0.005), Normal(0.75, 0.375)
+    else:
+        weight, delay = Normal(0.02, 0.002), Normal(1.5, 0.75)
+    conn = connect(layer_sizes[pre_name], layer_sizes[post_name], FixedProbability(p_conn),
+                   weight=positive(weight, 0.0), delay=positive(delay, 0.1),
+                   seed=rng, same=pre_name == post_name)
+    parts.append((conn, offsets[pre_name], offsets[post_name]))
+    print(f"  {pre_name:>6} -> {post_name:<6}: {len(conn):>8} synapses "
+          f"(expected {p_conn * layer_sizes[pre_name] * layer_sizes[post_name]:.0f})")
+
+circuit = merge(parts, n_neurons)
+elapsed = time.perf_counter() - start
+
+n_bytes = sum(a.nbytes for a in (circuit.indptr, circuit.targets, circuit.weights, circuit.delays))
+print(f"{n_neurons} neurons, {len(circuit)} synapses in {elapsed:.2f} s")
+print(f"CSR arrays: {n_bytes / 1e6:.1f} MB ({n_bytes / len(circuit):.1f} bytes per synapse)")
+print(f"Delays: {circuit.delays.min():.2f}-{circuit.delays.max():.2f} ms, "
+      f"mean out-degree {np.diff(circuit.indptr).mean():.1f}")
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Delayed exponential synapses
+The cortical microcircuit of advanced-topics.qmd with neun_py HH neurons,
+connected by one bank of chemical synapses: spikes travel through per-delay
+ring buffers and each neuron keeps one conductance per receptor type
+"""
+import time
+
+import numpy as np
+
+from neun_tools import (
+    ExponentialSynapses,
+    FixedProbability,
+    Normal,
+    connect,
+    create_hh_neuron,
+    merge,
+    stream_generators,
+)
+from neun_tools.coupling import inject_currents, read_voltages
+
+layer_sizes = {
+    'L2/3_E': 40,
+    'L2/3_I': 10,
+    'L4_E': 30,
+    'L4_I': 8,
+    'L5_E': 35,
+    'L5_I': 9,
+}
+
+# Connection probabilities (simplified from Potjans & Diesmann, 2014)
+connections = [
+    ('L4_E', 'L2/3_E', 0.15),
+    ('L4_E', 'L2/3_I', 0.10),
+    ('L2/3_E', 'L5_E', 0.05),
+    ('L2/3_I', 'L2/3_E', 0.20),
+    ('L4_I', 'L4_E', 0.25),
+    ('L5_I', 'L5_E', 0.20),
+]
+
+# Receptors: (tau_syn in ms, E_syn in mV), as in the qmd sketch
+receptors = {'exc': (5.0, 0.0), 'inh': (8.0, -80.0)}
+g_syn = {'exc': 0.0004, 'inh': 0.001}  # peak conductance per spike (HH_PARAMS units)
+
+dt = 0.01  # ms
+T = 100  # ms
+n_steps = int(round(T / dt))
+spike_threshold = 0.0  # mV
+I_drive = 0.1  # constant input to layer 4
+
+offsets = dict(zip(layer_sizes, np.cumsum([0] + list(layer_sizes.values()))))
+n_neurons = sum(layer_sizes.values())
+slices = {name: slice(offsets[name], offsets[name] + size) for name, size in layer_sizes.items()}
+
+rng = np.random.default_rng(42)
+neurons = [create_hh_neuron(initial={'v': v, 'm': 0.05, 'h': 0.6, 'n': 0.3})
+           for v in -65 + 3 * rng.standard_normal(n_neurons)]
+
+parts = []
+for stream, (pre_name, post_name, p_conn) in zip(stream_generators(42, range(len(connections))),
+                                                 connections):
+    kind = 'inh' if 'I' in pre_name else 'exc'
+    delay = 1.5 if kind == 'exc' else 0.75  # ms
+    conn = connect(layer_sizes[pre_name], layer_sizes[post_name], FixedProbability(p_conn),
+                   weight=g_syn[kind], delay=Normal(delay, delay / 10), seed=stream)
+    parts.append((conn, offsets[pre_name], offsets[post_name]))
+circuit = merge(parts, n_neurons)
+
+inhibitory = np.zeros(n_neurons, dtype=bool)
+for name in layer_sizes:
+    inhibitory[slices[name]] = 'I' in name
+synapses = ExponentialSynapses(neurons, circuit, dt, receptors,
+                               receptor=np.where(inhibitory[circuit.sources], 'inh', 'exc'))
+print(f"{n_neurons} neurons, {len(synapses)} synapses, "
+      f"delays of {synapses.delay_steps.min()}-{synapses.delay_steps.max()} steps")
+
+I_ext = np.zeros(n_neurons)
+I_ext[slices['L4_E']] = I_drive
+I_ext[slices['L4_I']] = I_drive
+
+spike_counts = np.zeros(n_neurons, dtype=int)
+V = read_voltages(neurons)
+start = time.perf_counter()
+for k in range(n_steps):
+    synapses.step(dt)
+    inject_currents(neurons, I_ext)
+    for neuron in neurons:
+        neuron.step(dt)
+    V, V_prev = read_voltages(neurons), V
+    spikes = (V > spike_threshold) & (V_prev <= spike_threshold)
+    synapses.push(spikes)
+    spike_counts += spikes
+print(f"Simulated {T} ms in {time.perf_counter() - start:.1f} s")
+
+for name, part in slices.items():
+    print(f"  {name:>6}: {1000 * spike_counts[part].mean() / T:6.1f} Hz")
@@ -0,0 +1,123 @@
+"""
+neun_tools: simulation and analysis helpers for the Neun workshop scripts
+"""
+from .adaptive import solve_adaptive
+from .bursts import Bursts, detect_bursts, phase_lags
+from .cache import SimulationCache, simulation_key
+from .checkpoint import Checkpoint, WarmStartStore, clone, get_params, get_state
+from .connectivity import (
+    Connections,
+    FixedInDegree,
+    FixedProbability,
+    FixedTotalNumber,
+    connect,
+    merge,
+)
+from .coupling import ExponentialSynapses, GapJunctions, SigmoidSynapses
+from .hh_population import HHPopulation
+from .models import (
+    HH_INITIAL,
+    HH_PARAMS,
+    HR_INITIAL,
+    HR_PARAMS,
+    IZ_INITIAL,
+    IZ_PARAMS,
+    create_hh_neuron,
+    model_family,
+    set_params,
+    set_state,
+    voltage_variable,
+)
+from .network import Network, NetworkSpec
+from .noise import NoiseInput, stream_generators
+from .population import Gamma, LogNormal, Normal, Population, Uniform
+from .rate_tables import HHRateTable
+from .parallel import ThreadedNetwork
+from .plasticity import STDPSynapses
+from .rates import PopulationRate, population_rate
+from .recording import Recorder
+from .simulation import run, run_spikes
+from .spikes import SpikeTrains, detect_crossings, detect_spikes
+from .stimulus import (
+    CompiledSchedule,
+    Constant,
+    Noise,
+    PatternSchedule,
+    PulseTrain,
+    Ramp,
+    Sine,
+    Step,
+    Stimulus,
+    Window,
+)
+from .sweep import firing_frequency, mean_voltage, parameter_grid, spike_count, sweep
+
+__all__ = [
+    'HH_INITIAL',
+    'HH_PARAMS',
+    'HR_INITIAL',
+    'HR_PARAMS',
+    'IZ_INITIAL',
+    'IZ_PARAMS',
+    'Connections',
+    'FixedInDegree',
+    'FixedProbability',
+    'FixedTotalNumber',
+    'connect',
+    'merge',
+    'ExponentialSynapses',
+    'GapJunctions',
+    'SigmoidSynapses',
+    'HHPopulation',
+    'HHRateTable',
+    'Network',
+    'NetworkSpec',
+    'ThreadedNetwork',
+    'Population',
+    'Gamma',
+    'LogNormal',
+    'Normal',
+    'Uniform',
+    'NoiseInput',
+    'create_hh_neuron',
+    'model_family',
+    'set_params',
+    'set_state',
+    'Checkpoint',
+    'WarmStartStore',
+    'clone',
+    'get_params',
+    'get_state',
+    'stream_generators',
+    'voltage_variable',
+    'STDPSynapses',
+    'Recorder',
+    'SimulationCache',
+    'simulation_key',
+    'run',
+    'run_spikes',
+    'SpikeTrains',
+    'detect_crossings',
+    'detect_spikes',
+    'Bursts',
+    'detect_bursts',
+    'phase_lags',
+    'PopulationRate',
+    'population_rate',
+    'CompiledSchedule',
+    'Constant',
+    'Noise',
+    'PatternSchedule',
+    'PulseTrain',
+    'Ramp',
+    'Sine',
+    'Step',
+    'Stimulus',
+    'Window',
+    'solve_adaptive',
+    'firing_frequency',
+    'mean_voltage',
+    'parameter_grid',
+    'spike_count',
+    'sweep',
+]
@@ -0,0 +1,22 @@
+"""
+Helpers for compressed sparse row layouts
+Shared by the synapse banks that deliver spikes along CSR rows
+"""
+import numpy as np
+
+
+def spike_indices(spikes):
+    """Indices of spiking neurons from an index array or a boolean mask"""
+    spikes = np.asarray(spikes)
+    if spikes.dtype == bool:
+        return np.flatnonzero(spikes)
+    return spikes.astype(np.intp, copy=False)
+
+
+def segments(ptr, index):
+    """Concatenated positions ptr[i]:ptr[i + 1] of every i in index"""
+    starts = ptr[index]
+    lengths = ptr[index + 1] - starts
+    total = lengths.sum()
+    offsets = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+    return offsets + np.arange(total)
@@ -0,0 +1,120 @@
+"""
+Adaptive-step integration with event location
+Dormand-Prince (scipy's RK45) with dense output and spike events
+for the HH, HR and Izhikevich models
+"""
+import numpy as np
+from scipy.integrate import solve_ivp
+
+from .models import MODELS
+
+
+class AdaptiveSolution:
+    """
+    Result of solve_adaptive().
+
+    Attributes:
+        t (ndarray): Sample times (uniform if dt_out was given, else the
+            accepted step times)
+        y (dict): Variable name -> samples at t
+        spike_times (ndarray): Located threshold crossings (Izhikevich: resets)
+        n_steps (int): Number of accepted adaptive steps
+
+    Calling the solution, sol(t), evaluates the dense output at any times.
+    """
+
+    def __init__(self, variables, segments, spike_times, n_steps, t_samples):
+        self.variables = variables
+        self._segments = segments
+        self.spike_times = np.asarray(spike_times)
+        self.n_steps = n_steps
+        self.t = t_samples
+        values = self(t_samples)
+        self.y = {name: values[i] for i, name in enumerate(variables)}
+
+    def __getitem__(self, name):
+        return self.y[name]
+
+    def __call__(self, t):
+        """Evaluate the dense output at times t, shape (n_variables, len(t))"""
+        t = np.atleast_1d(np.asarray(t, dtype=float))
+        out = np.empty((len(self.variables), len(t)))
+        bounds = [seg.t_max for seg in self._segments[:-1]]
+        which = np.searchsorted(bounds, t, side='right')
+        for i, seg in enumerate(self._segments):
+            mask = which == i
+            if np.any(mask):
+                out[:, mask] = seg(t[mask])
+        return out
+
+
+def solve_adaptive(model, t_end, I_ext=0.0, params=None, initial=None,
+                   rtol=1e-6, atol=1e-8, dt_out=None, threshold=None,
+                   max_step=np.inf):
+    """
+    Integrate one neuron with an embedded Runge-Kutta (Dormand-Prince) method.
+
+    Instead of choosing dt by hand, accuracy is given as rtol/atol: the
+    solver takes long steps in slow interspike intervals and short ones
+    during spikes. Threshold crossings are located on the dense output.
+
+    Times are physical times from t = 0. The fixed-step scripts label the
+    state after step k as k*dt, i.e. one dt earlier than its actual time.
+
+    Parameters:
+        model (str): 'HH', 'HR' or 'Iz'
+        t_end (float): Duration of the simulation (starts at t = 0)
+        I_ext (float or callable): Constant input or a function f(t)
+        params (dict): Overrides of the default parameter set
+        initial (dict): Overrides of the default initial conditions
+        rtol, atol (float): Relative and absolute error tolerances
+        dt_out (float): Resample the solution on a uniform grid 0, dt_out, ...
+            (default: return the accepted step times)
+        threshold (float): Spike threshold on the voltage variable
+            (default: 0 for HH/HR, 30 mV peak for Izhikevich)
+        max_step (float): Upper bound for the step size; keep it below the
+            shortest input feature when I_ext is time dependent
+
+    Returns:
+        AdaptiveSolution
+    """
+    variables, derivatives, default_params, default_initial, default_threshold = MODELS[model]
+    params = {**default_params, **(params or {})}
+    initial = {**default_initial, **(initial or {})}
+    threshold = default_threshold if threshold is None else threshold
+    current = I_ext if callable(I_ext) else (lambda t, I=float(I_ext): I)
+
+    def rhs(t, y):
+        return derivatives(y, params, current(t))
+
+    def spike(t, y):
+        return y[0] - threshold
+    spike.direction = 1.0
+    # Izhikevich spikes are resets: stop, apply v <- c, u <- u + d and restart
+    spike.terminal = model == 'Iz'
+
+    y0 = np.array([initial[name] for name in variables], dtype=float)
+    t0 = 0.0
+    segments, spike_times, step_times = [], [], [t0]
+    n_steps = 0
+
+    while True:
+        result = solve_ivp(rhs, (t0, t_end), y0, method='RK45', rtol=rtol,
+                           atol=atol, dense_output=True, events=spike,
+                           max_step=max_step)
+        if result.status == -1:
+            raise RuntimeError(result.message)
+        segments.append(result.sol)
+        step_times.extend(result.t[1:])
+        n_steps += len(result.t) - 1
+        spike_times.extend(result.t_events[0])
+
+        if result.status != 1:  # reached t_end
+            break
+        t0 = result.t_events[0][-1]
+        y0 = result.y_events[0][-1].copy()
+        y0[0] = params['c']
+        y0[1] += params['d']
+
+    t_samples = np.array(step_times) if dt_out is None else np.arange(0.0, t_end, dt_out)
+    return AdaptiveSolution(variables, segments, spike_times, n_steps, t_samples)
@@ -0,0 +1,255 @@
+"""
+Burst segmentation and phase analysis for CPG recordings
+Splits many traces into bursts at once and relates the bursts of
+different neurons with binary searches instead of all-pairs comparisons
+"""
+import numpy as np
+import pandas as pd
+
+from .spikes import detect_spikes
+
+
+def _row_bounds(rows, n_rows):
+    """Start of each row's block in a row-sorted flat array, plus the end"""
+    return np.searchsorted(rows, np.arange(n_rows + 1))
+
+
+def _transitions(V, on, off):
+    """
+    Onset and offset samples of the hysteresis state of every trace.
+
+    The state switches on when V rises above `on` and off when it falls
+    below `off`. Only the crossings of the two thresholds can change it,
+    and the state after a crossing depends only on which threshold was
+    crossed, so a crossing is a transition exactly when it differs from the
+    previous crossing (or from the initial state, for the first of a row).
+
+    Returns:
+        (rows, indices, is_onset) of the transitions, sorted by row and time
+    """
+    n_rows, n_samples = V.shape
+    up = (V[:, :-1] <= on) & (V[:, 1:] > on)
+    down = (V[:, :-1] >= off) & (V[:, 1:] < off)
+    rows, indices = np.divmod(np.flatnonzero(up | down), n_samples - 1)
+    is_on = up[rows, indices]
+    indices += 1
+
+    previous = np.empty_like(is_on)
+    previous[1:] = is_on[:-1]
+    first = np.ones(len(rows), dtype=bool)
+    first[1:] = rows[1:] != rows[:-1]
+    previous[first] = V[rows[first], 0] > on
+    change = is_on != previous
+    return rows[change], indices[change], is_on[change]
+
+
+class Bursts:
+    """
+    Bursts of a batch of traces, stored as flat arrays sorted by trace and time.
+
+    Attributes:
+        rows (ndarray): Trace of each burst
+        onsets, offsets (ndarray): First and last sample of each burst
+        n_spikes (ndarray): Spikes (local maxima) inside each burst
+        dt (float): Sampling step
+        n_rows (int): Number of traces
+    """
+
+    def __init__(self, rows, onsets, offsets, n_spikes, dt, n_rows):
+        self.rows = rows
+        self.onsets = onsets
+        self.offsets = offsets
+        self.n_spikes = n_spikes
+        self.dt = dt
+        self.n_rows = n_rows
+        self._bounds = _row_bounds(rows, n_rows)
+        self._has_next = np.zeros(len(rows), dtype=bool)
+        self._has_next[:-1] = rows[1:] == rows[:-1]
+
+    def __len__(self):
+        return len(self.rows)
+
+    def of(self, row):
+        """Slice selecting the bursts of one trace in the flat arrays"""
+        return slice(self._bounds[row], self._bounds[row + 1])
+
+    @property
+    def counts(self):
+        """Number of bursts per trace"""
+        return np.diff(self._bounds)
+
+    @property
+    def onset_times(self):
+        return self.onsets * self.dt
+
+    @property
+    def offset_times(self):
+        return self.offsets * self.dt
+
+    @property
+    def durations(self):
+        return (self.offsets - self.onsets) * self.dt
+
+    def _to_next(self, values):
+        """values[i + 1] - x for consecutive bursts of a trace, NaN for the last"""
+        out = np.full(len(self.rows), np.nan)
+        out[:-1][self._has_next[:-1]] = values[1:][self._has_next[:-1]]
+        return out
+
+    @property
+    def periods(self):
+        """Onset to next onset of the same trace (NaN for the last burst)"""
+        return (self._to_next(self.onsets) - self.onsets) * self.dt
+
+    @property
+    def ibis(self):
+        """Inter-burst interval: offset to next onset (NaN for the last burst)"""
+        return (self._to_next(self.onsets) - self.offsets) * self.dt
+
+    @property
+    def duty_cycles(self):
+        """Burst duration over period (NaN for the last burst)"""
+        return self.durations / self.periods
+
+    def statistics(self):
+        """
+        Rhythm statistics per trace.
+
+        Returns:
+            pd.DataFrame: one row per trace with the number of bursts and the
+            mean (and CV for the period) of the per-burst measures
+        """
+        def mean(values):
+            valid = ~np.isnan(values)
+            total = np.bincount(self.rows[valid], values[valid], self.n_rows)
+            n = np.bincount(self.rows[valid], minlength=self.n_rows)
+            with np.errstate(invalid='ignore'):
+                return total / n
+
+        periods = self.periods
+        mean_period = mean(periods)
+        with np.errstate(invalid='ignore'):
+            period_cv = np.sqrt(mean((periods - mean_period[self.rows]) ** 2)) / mean_period
+        return pd.DataFrame({
+            'n_bursts': self.counts,
+            'period': mean_period,
+            'period_cv': period_cv,
+            'duration': mean(self.durations),
+            'ibi': mean(self.ibis),
+            'duty_cycle': mean(self.duty_cycles),
+            'spikes_per_burst': mean(self.n_spikes.astype(float)),
+        })
+
+
+def detect_bursts(V, dt, on, off, min_gap=0.0, min_duration=0.0, spike_threshold=None):
+    """
+    Segment one or many traces into bursts.
+
+    A burst starts when V rises above `on` and ends when it next falls below
+    `off` (on > off). Bursts separated by less than `min_gap` are merged,
+    which bridges the troughs between the spikes of a burst, and bursts
+    shorter than `min_duration` are dropped. Bursts already active at the
+    first sample or still active at the last are incomplete and left out.
+
+    Parameters:
+        V (array): (n_samples,) trace or (n_traces, n_samples) batch
+        dt (float): Sampling step
+        on, off (float): Hysteresis thresholds
+        min_gap (float): Shortest silent interval between two bursts
+        min_duration (float): Shortest burst
+        spike_threshold (float): Threshold for counting spikes as local
+            maxima inside bursts (default `on`)
+
+    Returns:
+        Bursts
+    """
+    V = np.atleast_2d(V)
+    n_rows, n_samples = V.shape
+    rows, indices, is_onset = _transitions(V, on, off)
+
+    # Transitions alternate within a row: drop a leading offset and a
+    # trailing onset so that they pair up as (onset, offset)
+    bounds = _row_bounds(rows, n_rows)
+    keep = np.ones(len(rows), dtype=bool)
+    starts, ends = bounds[:-1], bounds[1:] - 1
+    nonempty = ends >= starts
+    starts, ends = starts[nonempty], ends[nonempty]
+    keep[starts[~is_onset[starts]]] = False
+    keep[ends[is_onset[ends]]] = False
+    rows, indices = rows[keep], indices[keep]
+    rows, onsets, offsets = rows[0::2], indices[0::2], indices[1::2]
+
+    # Merge bursts closer than min_gap: a new group starts at a row change
+    # or after a long enough silence
+    if min_gap > 0 and len(rows):
+        new = np.ones(len(rows), dtype=bool)
+        new[1:] = (rows[1:] != rows[:-1]) | ((onsets[1:] - offsets[:-1]) * dt >= min_gap)
+        group_start = np.flatnonzero(new)
+        group_end = np.append(group_start[1:], len(rows)) - 1
+        rows, onsets, offsets = rows[group_start], onsets[group_start], offsets[group_end]
+
+    long_enough = (offsets - onsets) * dt >= min_duration
+    rows, onsets, offsets = rows[long_enough], onsets[long_enough], offsets[long_enough]
+
+    peaks = detect_spikes(V, dt, on if spike_threshold is None else spike_threshold)
+    peak_keys = peaks.rows * np.int64(n_samples) + peaks.indices
+    base = rows * np.int64(n_samples)
+    n_spikes = (np.searchsorted(peak_keys, base + offsets, side='right')
+                - np.searchsorted(peak_keys, base + onsets, side='left'))
+
+    return Bursts(rows, onsets, offsets, n_spikes, dt, n_rows)
+
+
+def phase_lags(bursts, reference, follower):
+    """
+    Relate every burst of `reference` traces to the bursts of `follower` traces.
+
+    For each reference burst the follower onsets are located with one binary
+    search, giving O((n + m) log m) work for n reference and m follower
+    bursts. Many circuits are handled at once by passing arrays of trace
+    indices: pair p relates trace reference[p] to trace follower[p].
+
+    Parameters:
+        bursts (Bursts): Bursts of all traces
+        reference, follower (int or array): Trace indices of each pair
+
+    Returns:
+        dict of flat arrays, one entry per reference burst:
+            'pair': index of the pair
+            'burst': index of the reference burst in the Bursts arrays
+            'lag': follower onset nearest to the reference onset, minus the
+                reference onset (NaN if the follower has no bursts)
+            'phase': delay to the next follower onset over the reference
+                period, in [0, 1) (NaN if it falls outside the cycle)
+    """
+    reference = np.atleast_1d(reference)
+    follower = np.atleast_1d(follower)
+    counts = bursts.counts
+    bounds = bursts._bounds
+
+    # Reference bursts of every pair, flattened
+    n_ref = counts[reference]
+    pair = np.repeat(np.arange(len(reference)), n_ref)
+    offset = np.repeat(bounds[reference] - np.cumsum(n_ref) + n_ref, n_ref)
+    burst = offset + np.arange(len(pair))
+    onset = bursts.onsets[burst]
+
+    # Binary search of each onset among the follower's onsets
+    lo = bounds[follower][pair]
+    hi = bounds[follower + 1][pair]
+    span = np.int64(bursts.onsets.max(initial=0) + 1)
+    keys = bursts.rows * span + bursts.onsets
+    position = np.searchsorted(keys, follower[pair] * span + onset, side='left')
+
+    after = position < hi
+    before = position > lo
+    next_onset = np.where(after, bursts.onsets[np.minimum(position, len(keys) - 1)], -1)
+    prev_onset = np.where(before, bursts.onsets[np.maximum(position - 1, 0)], -1)
+    use_next = after & (~before | (next_onset - onset < onset - prev_onset))
+    nearest = np.where(use_next, next_onset, prev_onset)
+    lag = np.where(after | before, (nearest - onset) * bursts.dt, np.nan)
+
+    with np.errstate(invalid='ignore'):
+        phase = np.where(after, (next_onset - onset) * bursts.dt, np.nan) / bursts.periods[burst]
+    phase[phase >= 1] = np.nan
+    return {'pair': pair, 'burst': burst, 'lag': lag, 'phase': phase}
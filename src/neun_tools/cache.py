@@ -0,0 +1,175 @@
+"""
+Content-addressed on-disk cache for simulation results
+Identical simulations are keyed by a hash of everything that defines them
+"""
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from .stimulus import Stimulus
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'neun_tools')
+
+
+def _canonical(obj):
+    """Convert obj into JSON-serializable data with a stable representation"""
+    if isinstance(obj, dict):
+        return {str(k): _canonical(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_canonical(v) for v in obj]
+    if isinstance(obj, np.ndarray):
+        data = np.ascontiguousarray(obj)
+        return {'__ndarray__': hashlib.sha256(data.tobytes()).hexdigest(),
+                'dtype': data.dtype.str, 'shape': list(data.shape)}
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, type):
+        return obj.__name__
+    return obj
+
+
+def simulation_key(model, params, initial, dt, n_steps, I_ext=None, seed=None, **extra):
+    """
+    Return the hex digest identifying one simulation.
+
+    Parameters:
+        model: neun_py class (e.g. neun_py.HRDoubleRK4) or its name
+        params (dict): Model parameters
+        initial (dict): Initial conditions
+        dt (float): Integration time step
+        n_steps (int): Number of steps
+        I_ext (float, array or Stimulus): Input current; a Stimulus is keyed
+            by the samples it renders over the n_steps steps
+        seed: Random seed used to build the input, if any
+        **extra: Anything else that changes the result (recorded variables,
+            analysis options, ...)
+    """
+    if isinstance(I_ext, Stimulus):
+        I_ext = I_ext.render(n_steps, dt)
+    description = {
+        'model': model if isinstance(model, str) else model.__name__,
+        'params': params,
+        'initial': initial,
+        'dt': dt,
+        'n_steps': int(n_steps),
+        'I_ext': np.asarray(I_ext, dtype=float) if I_ext is not None else None,
+        'seed': seed,
+        'extra': extra,
+    }
+    text = json.dumps(_canonical(description), sort_keys=True)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def _remove(path):
+    """Delete a file that another process may already have deleted"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class SimulationCache:
+    """
+    Directory of stored simulation results with size-based LRU eviction.
+
+    Each entry is an .npz file named after its key. Reading an entry marks
+    it as recently used; when the directory grows beyond `max_bytes` the
+    least recently used entries are deleted.
+
+    Parameters:
+        directory (str): Cache location (default: $NEUN_TOOLS_CACHE or
+            ~/.cache/neun_tools)
+        max_bytes (int): Size limit of the cache (default: 1 GiB)
+
+    Example:
+        cache = SimulationCache()
+        key = simulation_key(neun_py.HRDoubleRK4, HR_PARAMS, HR_INITIAL,
+                             dt, n_steps, I_clean)
+        V_clean = cache.get_or_compute(key, lambda: simulate_HR(I_clean))['data']
+    """
+
+    def __init__(self, directory=None, max_bytes=1 << 30):
+        self.directory = directory or os.environ.get('NEUN_TOOLS_CACHE', DEFAULT_CACHE_DIR)
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def __contains__(self, key):
+        return os.path.exists(self._path(key))
+
+    def get(self, key):
+        """Return the stored {name: array} dict, or None on a miss"""
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as stored:
+                result = {name: stored[name] for name in stored.files}
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass  # evicted by another process after we read it
+        return result
+
+    def put(self, key, **arrays):
+        """Store named arrays (or scalars) under key and enforce the size limit"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, **arrays)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            _remove(tmp_path)
+            raise
+        self.evict()
+
+    def get_or_compute(self, key, compute):
+        """
+        Return the entry for key, computing and storing it on a miss.
+
+        compute() may return an array, stored as 'data', or a dict of arrays.
+        """
+        result = self.get(key)
+        if result is None:
+            value = compute()
+            result = value if isinstance(value, dict) else {'data': value}
+            self.put(key, **result)
+            result = {name: np.asarray(v) for name, v in result.items()}
+        return result
+
+    def size(self):
+        """Total size in bytes of the stored entries"""
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits max_bytes"""
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            _remove(path)
+            total -= size
+
+    def clear(self):
+        """Delete every entry"""
+        for path, _, _ in self._entries():
+            _remove(path)
+
+    def _entries(self):
+        """(path, size, last use) of every stored entry"""
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith('.npz'):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((entry.path, stat.st_size, stat.st_mtime))
+        return entries
@@ -0,0 +1,197 @@
+"""
+Checkpoints of neun_py neurons and synapses
+Captures every variable and parameter exposed through the neun_py enums so
+a simulation can be restored, cloned, resumed, or started from a settled state
+"""
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from .cache import SimulationCache, simulation_key
+from .models import is_synapse, parameter_enum, variable_enum
+from .simulation import _advance, _current_sequence
+
+
+def _members(enum):
+    """{name: member} of a neun_py (pybind11) enum"""
+    return dict(enum.__members__)
+
+
+def get_state(obj):
+    """Variables of a neuron or synapse as a {name: value} dict"""
+    return {name: obj.get(member) for name, member in _members(variable_enum(obj)).items()}
+
+
+def get_params(obj):
+    """Parameters of a neuron or synapse as a {name: value} dict"""
+    return {name: obj.get_param(member)
+            for name, member in _members(parameter_enum(obj)).items()}
+
+
+class Checkpoint:
+    """
+    Snapshot of the variables and parameters of a list of neun_py objects.
+
+    Only what neun_py exposes through get()/get_param() is captured, so take
+    checkpoints between steps, when no synaptic input is pending. Neurons
+    and electrical synapses (ESyn*) can be checkpointed; diffusion synapses
+    (DSyn*) do not expose their state or constants to Python, and capturing
+    one raises a TypeError.
+    Restoring needs objects of the same classes in the same order; synapses
+    keep referencing the neurons they were built with, so rebuild the network
+    the same way and restore the checkpoint into it.
+
+        checkpoint = Checkpoint.capture(neurons + synapses, step=k)
+        checkpoint.save('run.ckpt')
+        ...
+        checkpoint = Checkpoint.load('run.ckpt')
+        checkpoint.restore(neurons + synapses)
+        k = checkpoint.meta['step']
+
+    Attributes:
+        entries (list): {'class', 'variables', 'params'} dict per object
+        meta (dict): Free JSON-serializable data stored with the checkpoint
+    """
+
+    def __init__(self, entries, meta=None):
+        self.entries = entries
+        self.meta = meta or {}
+
+    @classmethod
+    def capture(cls, objects, **meta):
+        """Checkpoint a neuron, a synapse or a list of them"""
+        if not isinstance(objects, (list, tuple)):
+            objects = [objects]
+        entries = [{'class': type(obj).__name__,
+                    'variables': get_state(obj),
+                    'params': get_params(obj)} for obj in objects]
+        return cls(entries, meta)
+
+    def restore(self, objects):
+        """Write the stored variables and parameters back into objects"""
+        if not isinstance(objects, (list, tuple)):
+            objects = [objects]
+        if len(objects) != len(self.entries):
+            raise ValueError(f"Checkpoint has {len(self.entries)} objects, got {len(objects)}")
+        for obj, entry in zip(objects, self.entries):
+            if type(obj).__name__ != entry['class']:
+                raise TypeError(f"Cannot restore a {entry['class']} checkpoint "
+                                f"into a {type(obj).__name__}")
+            P = parameter_enum(obj)
+            for name, value in entry['params'].items():
+                obj.set_param(getattr(P, name), value)
+            V = variable_enum(obj)
+            for name, value in entry['variables'].items():
+                obj.set(getattr(V, name), value)
+
+    def to_bytes(self):
+        # json writes floats with repr(), which round-trips them exactly
+        return json.dumps({'entries': self.entries, 'meta': self.meta}).encode()
+
+    @classmethod
+    def from_bytes(cls, data):
+        content = json.loads(bytes(data).decode())
+        return cls(content['entries'], content['meta'])
+
+    def save(self, path):
+        """Write the checkpoint to path atomically (an interrupted save keeps the old file)"""
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(self.to_bytes())
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+
+def clone(neuron):
+    """New neuron of the same class with the same variables and parameters"""
+    import neun_py
+    if is_synapse(neuron):
+        raise TypeError("Synapses reference their neurons; rebuild them and use Checkpoint")
+    args = getattr(neun_py, variable_enum(neuron).__name__.replace('Variable', 'ConstructorArgs'))
+    copy = type(neuron)(args())
+    Checkpoint.capture(neuron).restore(copy)
+    return copy
+
+
+def _settle(objects, dt, n_steps, I_ext):
+    """Integrate objects for n_steps: synapses first, then input and neuron steps"""
+    neurons = [obj for obj in objects if not is_synapse(obj)]
+    synapses = [obj for obj in objects if is_synapse(obj)]
+    currents = _current_sequence(I_ext, n_steps, dt)
+    if not synapses and len(neurons) == 1:
+        _advance(neurons[0], dt, currents, 0, n_steps)
+        return
+    for k in range(n_steps):
+        for synapse in synapses:
+            synapse.step(dt)
+        for neuron in neurons:
+            if currents is not None:
+                neuron.add_synaptic_input(currents[k] if isinstance(currents, list) else currents)
+            neuron.step(dt)
+
+
+class WarmStartStore:
+    """
+    Settled states keyed by everything that determines them.
+
+    settle() integrates the transient once for a given set of classes,
+    parameters, initial state, input and duration, stores the resulting
+    checkpoint, and afterwards restores it directly. Sweeps and repeated
+    trials can then start from the steady state instead of re-simulating it.
+
+        store = WarmStartStore()
+        for gna in values:
+            neuron = create_hh_neuron({'gna': gna})
+            store.settle(neuron, dt=0.001, n_steps=50000, I_ext=0.0)
+            V = run(neuron, dt, n_steps, I_ext)
+
+    Parameters:
+        cache (SimulationCache): Storage for the checkpoints (default: a
+            SimulationCache in its default directory)
+    """
+
+    def __init__(self, cache=None):
+        self.cache = cache if cache is not None else SimulationCache()
+
+    def key(self, objects, dt, n_steps, I_ext=0.0, **extra):
+        """Key of the settled state, from the current state of objects"""
+        captured = Checkpoint.capture(objects)
+        return simulation_key(
+            '+'.join(entry['class'] for entry in captured.entries),
+            [entry['params'] for entry in captured.entries],
+            [entry['variables'] for entry in captured.entries],
+            dt, n_steps, I_ext, **extra)
+
+    def settle(self, objects, dt, n_steps, I_ext=0.0, **extra):
+        """
+        Bring objects to their state after n_steps of the transient.
+
+        Neurons receive I_ext (as in run()) and synapses are stepped before
+        neurons, as in the workshop scripts. **extra is added to the key,
+        for anything else that changes the transient.
+
+        Returns:
+            bool: True if the state was restored from the store
+        """
+        if not isinstance(objects, (list, tuple)):
+            objects = [objects]
+        key = self.key(objects, dt, n_steps, I_ext, **extra)
+        stored = self.cache.get(key)
+        if stored is not None:
+            Checkpoint.from_bytes(stored['checkpoint'].tobytes()).restore(objects)
+            return True
+        _settle(objects, dt, n_steps, I_ext)
+        data = Checkpoint.capture(objects).to_bytes()
+        self.cache.put(key, checkpoint=np.frombuffer(data, dtype=np.uint8))
+        return False
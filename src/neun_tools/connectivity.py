@@ -0,0 +1,221 @@
+"""
+Random connectivity generated directly into compressed sparse arrays
+Fixed-probability, fixed-in-degree and fixed-total-number rules drawn
+without ever building an n_pre x n_post matrix
+"""
+import numpy as np
+import scipy.sparse as sp
+
+
+def _skip(index, excluded):
+    """Map indices into the n - 1 neurons other than `excluded` to neuron indices"""
+    return index + (index >= excluded)
+
+
+def _split(flat, n_pre, n_post, same):
+    """(pre, post) of sorted flat pair indices, skipping pre == post if same"""
+    width = n_post - 1 if same else n_post
+    pre, post = np.divmod(flat, width)
+    if same:
+        post = _skip(post, pre)
+    return pre, post
+
+
+class FixedProbability:
+    """
+    Each pair is connected independently with probability p.
+
+    Drawn by geometric skipping: the gaps between connected pairs, in
+    row-major (pre, post) order, are geometric with parameter p, so the cost
+    and memory are proportional to the p * n_pre * n_post connections.
+    """
+
+    def __init__(self, p, autapses=False):
+        if not 0.0 <= p <= 1.0:
+            raise ValueError(f"p must be in [0, 1], got {p}")
+        self.p = p
+        self.autapses = autapses
+
+    def pairs(self, n_pre, n_post, rng, same=False):
+        same = same and not self.autapses
+        total = n_pre * (n_post - 1 if same else n_post)
+        if self.p == 0.0 or total == 0:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+        expected = self.p * total
+        chunk = int(expected + 6.0 * np.sqrt(expected * (1.0 - self.p)) + 16)
+        parts = []
+        last = -1
+        while True:
+            flat = last + np.cumsum(rng.geometric(self.p, chunk))
+            if flat[-1] >= total:
+                parts.append(flat[flat < total])
+                break
+            parts.append(flat)
+            last = flat[-1]
+        return _split(np.concatenate(parts), n_pre, n_post, same)
+
+
+class FixedInDegree:
+    """Every postsynaptic neuron receives exactly k connections from random sources"""
+
+    def __init__(self, k, autapses=False, multapses=True):
+        self.k = int(k)
+        self.autapses = autapses
+        self.multapses = multapses
+
+    def pairs(self, n_pre, n_post, rng, same=False):
+        same = same and not self.autapses
+        n_sources = n_pre - 1 if same else n_pre
+        if not self.multapses and self.k > n_sources:
+            raise ValueError(f"In-degree {self.k} needs multapses with {n_sources} sources")
+        pre = rng.integers(0, n_sources, (n_post, self.k))
+        if not self.multapses:
+            # Redraw repeated sources until every row is distinct
+            while True:
+                pre.sort(axis=1)
+                repeated = np.zeros(pre.shape, dtype=bool)
+                repeated[:, 1:] = pre[:, 1:] == pre[:, :-1]
+                n_repeated = np.count_nonzero(repeated)
+                if not n_repeated:
+                    break
+                pre[repeated] = rng.integers(0, n_sources, n_repeated)
+        post = np.repeat(np.arange(n_post), self.k)
+        pre = pre.ravel()
+        if same:
+            pre = _skip(pre, post)
+        order = np.argsort(pre, kind='stable')
+        return pre[order], post[order]
+
+
+class FixedTotalNumber:
+    """Exactly n connections between uniformly drawn pairs"""
+
+    def __init__(self, n, autapses=False, multapses=True):
+        self.n = int(n)
+        self.autapses = autapses
+        self.multapses = multapses
+
+    def pairs(self, n_pre, n_post, rng, same=False):
+        same = same and not self.autapses
+        total = n_pre * (n_post - 1 if same else n_post)
+        if self.multapses:
+            flat = rng.integers(0, total, self.n)
+        else:
+            if self.n > total:
+                raise ValueError(f"{self.n} connections need multapses with {total} pairs")
+            flat = rng.choice(total, self.n, replace=False)
+        flat.sort()
+        return _split(flat, n_pre, n_post, same)
+
+
+def _draw(value, rng, size):
+    """Scalar or array broadcast to size, or values drawn by f(rng, size)"""
+    if callable(value):
+        value = value(rng, size)
+    return np.array(np.broadcast_to(np.asarray(value, dtype=float), (size,)))
+
+
+class Connections:
+    """
+    Synapses from n_pre to n_post neurons in compressed sparse row form.
+
+    Row i holds the outgoing synapses of presynaptic neuron i:
+    targets[indptr[i]:indptr[i + 1]], with one weight and one delay each,
+    which is the layout spike delivery needs (a spike of neuron i reaches
+    exactly that slice).
+
+    Attributes:
+        indptr (ndarray): Row pointers, length n_pre + 1
+        targets (ndarray): Postsynaptic neuron of every synapse
+        weights (ndarray): Weight of every synapse
+        delays (ndarray): Delay of every synapse (ms)
+    """
+
+    def __init__(self, indptr, targets, weights, delays, n_pre, n_post):
+        self.indptr = indptr
+        self.targets = targets
+        self.weights = weights
+        self.delays = delays
+        self.n_pre = n_pre
+        self.n_post = n_post
+
+    def __len__(self):
+        return len(self.targets)
+
+    @classmethod
+    def from_pairs(cls, pre, post, weights, delays, n_pre, n_post):
+        """Build from (pre, post) pairs sorted by pre"""
+        indptr = np.zeros(n_pre + 1, dtype=np.intp)
+        np.cumsum(np.bincount(pre, minlength=n_pre), out=indptr[1:])
+        return cls(indptr, np.asarray(post, dtype=np.intp), weights, delays, n_pre, n_post)
+
+    @property
+    def sources(self):
+        """Presynaptic neuron of every synapse"""
+        return np.repeat(np.arange(self.n_pre), np.diff(self.indptr))
+
+    def of(self, pre):
+        """Slice of the synapses of presynaptic neuron `pre`"""
+        return slice(self.indptr[pre], self.indptr[pre + 1])
+
+    def pairs(self):
+        """(pre, post) index arrays, e.g. a NetworkSpec.connect() rule"""
+        return self.sources, self.targets
+
+    def to_sparse(self):
+        """(n_post, n_pre) CSR weight matrix W[post, pre], as STDPSynapses takes"""
+        W = sp.csr_matrix((self.weights, self.targets, self.indptr),
+                          shape=(self.n_pre, self.n_post))
+        return W.T.tocsr()
+
+
+def connect(n_pre, n_post, rule, weight=1.0, delay=1.0, seed=None, same=False):
+    """
+    Draw random connections between two populations.
+
+    Parameters:
+        n_pre, n_post (int): Population sizes
+        rule: FixedProbability(p), FixedInDegree(k) or FixedTotalNumber(n)
+        weight, delay: Scalar, array with one value per synapse (in the
+            order of the result), or callable f(rng, n) such as
+            Normal(1.5, 0.75) (delays should be positive)
+        seed: Seed or NumPy Generator; the same seed gives the same synapses
+        same (bool): The populations are the same, so self-connections are
+            dropped unless the rule has autapses=True
+
+    Returns:
+        Connections
+
+    Example (microcircuit-connectivity.py):
+        conn = connect(2000, 1500, FixedProbability(0.1), weight=0.02,
+                       delay=Normal(1.5, 0.75), seed=42)
+    """
+    rng = np.random.default_rng(seed)
+    pre, post = rule.pairs(n_pre, n_post, rng, same)
+    return Connections.from_pairs(pre, post, _draw(weight, rng, len(pre)),
+                                  _draw(delay, rng, len(pre)), n_pre, n_post)
+
+
+def merge(parts, n_neurons):
+    """
+    Combine projections between populations into one network-wide Connections.
+
+    Parameters:
+        parts: Iterable of (connections, pre_offset, post_offset), the
+            offsets being the first index of each population
+        n_neurons (int): Size of the network
+    """
+    pre, post, weights, delays = [], [], [], []
+    for conn, pre_offset, post_offset in parts:
+        pre.append(conn.sources + pre_offset)
+        post.append(conn.targets + post_offset)
+        weights.append(conn.weights)
+        delays.append(conn.delays)
+    if not pre:
+        return Connections.from_pairs(np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp),
+                                      np.empty(0), np.empty(0), n_neurons, n_neurons)
+    pre = np.concatenate(pre)
+    order = np.argsort(pre, kind='stable')
+    return Connections.from_pairs(pre[order], np.concatenate(post)[order],
+                                  np.concatenate(weights)[order],
+                                  np.concatenate(delays)[order], n_neurons, n_neurons)
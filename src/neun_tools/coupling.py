@@ -0,0 +1,292 @@
+"""
+Matrix-based coupling between neurons
+All gap-junction currents of a network come from one matrix-vector product,
+and chemical synapses are updated as banks rather than one object each
+"""
+import numpy as np
+import scipy.sparse as sp
+
+from ._csr import segments, spike_indices
+from .models import voltage_variable
+
+
+def _is_population(target):
+    """True for vectorized populations, False for a list of neun_py neurons"""
+    return hasattr(target, 'size') and not isinstance(target, (list, tuple))
+
+
+def _target_dtype(target):
+    """Floating-point type of a population (float64 for neun_py neurons)"""
+    return np.dtype(getattr(target, 'dtype', np.float64))
+
+
+def read_voltages(target):
+    """Membrane potentials of a population or a list of neun_py neurons"""
+    if _is_population(target):
+        return target.get('v')
+    get_v = voltage_variable(target[0])
+    return np.fromiter((neuron.get(get_v) for neuron in target), float, len(target))
+
+
+def inject_currents(target, I):
+    """Add one current per neuron to a population or a list of neun_py neurons"""
+    if _is_population(target):
+        target.add_synaptic_input(I)
+        return
+    for neuron, current in zip(target, I.tolist()):
+        neuron.add_synaptic_input(current)
+
+
+class GapJunctions:
+    """
+    Electrical synapses of a whole network as one conductance matrix.
+
+    Uses the same convention as ESyn*DoubleRK4: the current added to
+    neuron i is
+
+        I_i = sum_j G[i, j] * (V_i - V_j)
+
+    so the negative conductances of the workshop scripts give diffusive
+    coupling. An ESyn between neurons i and j with conductances (g1, g2)
+    is G[i, j] = g1, G[j, i] = g2. G is stored in the floating-point type
+    of the population (float32 populations get a float32 matrix).
+
+    Parameters:
+        neurons: List of neun_py neurons or a vectorized population
+        G: (N, N) conductance matrix, dense or scipy sparse (stored as CSR)
+
+    As with ESyn objects, call step() before stepping the neurons:
+
+        gap.step(dt)
+        for neuron in neurons:
+            neuron.step(dt)
+    """
+
+    def __init__(self, neurons, G):
+        dtype = _target_dtype(neurons)
+        if sp.issparse(G):
+            G = sp.csr_matrix(G, dtype=dtype)
+            row_sums = np.asarray(G.sum(axis=1), dtype=dtype).ravel()
+        else:
+            G = np.asarray(G, dtype=dtype)
+            row_sums = G.sum(axis=1)
+        n = len(neurons) if not _is_population(neurons) else neurons.size
+        if G.shape != (n, n):
+            raise ValueError(f"G has shape {G.shape}, expected ({n}, {n})")
+
+        self.neurons = neurons
+        self.G = G
+        self._row_sums = row_sums
+        self.I = np.zeros(n, dtype=dtype)
+
+    @classmethod
+    def from_pairs(cls, neurons, pairs, sparse=True):
+        """
+        Build from ESyn-style (i, j, g1, g2) tuples.
+
+        Example:
+            pairs = [(i, j, -0.0005, -0.0005)
+                     for i in range(n) for j in range(i + 1, n)]
+            gap = GapJunctions.from_pairs(neurons, pairs)
+        """
+        n = len(neurons) if not _is_population(neurons) else neurons.size
+        i, j, g1, g2 = (np.asarray(col) for col in zip(*pairs))
+        G = sp.coo_matrix((np.concatenate([g1, g2]).astype(float),
+                           (np.concatenate([i, j]), np.concatenate([j, i]))),
+                          shape=(n, n))
+        return cls(neurons, G.tocsr() if sparse else G.toarray())
+
+    def currents(self, V):
+        """Coupling current of every neuron for voltages V"""
+        return self._row_sums * V - self.G @ V
+
+    def step(self, dt=None):
+        """Compute the currents from the present voltages and inject them"""
+        self.I = self.currents(read_voltages(self.neurons))
+        inject_currents(self.neurons, self.I)
+
+
+class SigmoidSynapses:
+    """
+    Bank of voltage-gated conductance synapses updated in one call.
+
+    Every synapse s connects pre[s] -> post[s] and has a first-order
+    activation m_s opened by a sigmoid of the presynaptic voltage:
+
+        dm/dt = k1 * S(V_pre) * (1 - m) - k2 * m
+        S(V)  = 1 / (1 + exp((v_th - V) / v_slope))
+        I_post = g * m * (e_syn - V_post)
+
+    m is advanced with the exact exponential solution for S frozen over
+    the step, and the currents of all synapses are scatter-added onto
+    their postsynaptic neurons, like many add_synaptic_input calls.
+
+    This is a generic graded synapse, not a vectorized DSyn*: neun_py does
+    not expose the kinetics of its diffusion synapse, and the defaults
+    below are illustrative values, not DSynHHHHDoubleRK4's.
+
+    Parameters:
+        neurons: List of neun_py neurons or a vectorized population
+        pre, post (array): Presynaptic and postsynaptic index of each synapse
+        g, e_syn, v_th, v_slope, k1, k2: Scalars or per-synapse arrays
+        m0: Initial activation (default: 0)
+
+    State and parameters use the floating-point type of the population.
+
+    Example:
+        pre, post = np.nonzero(connectivity)
+        synapses = SigmoidSynapses(neurons, pre, post, g=0.002)
+        synapses.step(dt)   # before stepping the neurons
+    """
+
+    def __init__(self, neurons, pre, post, g=0.002, e_syn=0.0, v_th=-20.0,
+                 v_slope=5.0, k1=1.0, k2=0.1, m0=0.0):
+        self.neurons = neurons
+        self.n_neurons = len(neurons) if not _is_population(neurons) else neurons.size
+        self.pre = np.asarray(pre, dtype=np.intp)
+        self.post = np.asarray(post, dtype=np.intp)
+        if self.pre.shape != self.post.shape:
+            raise ValueError("pre and post must have the same length")
+
+        dtype = _target_dtype(neurons)
+
+        def per_synapse(value):
+            return np.broadcast_to(np.asarray(value, dtype=dtype), self.pre.shape).copy()
+
+        self.g = per_synapse(g)
+        self.e_syn = per_synapse(e_syn)
+        self.v_th = per_synapse(v_th)
+        self.v_slope = per_synapse(v_slope)
+        self.k1 = per_synapse(k1)
+        self.k2 = per_synapse(k2)
+        self.m = per_synapse(m0)
+        self.I = np.zeros(self.n_neurons, dtype=dtype)
+
+    def __len__(self):
+        return len(self.pre)
+
+    def _advance(self, V, v_post, dt, index=slice(None)):
+        """Update the activations of synapses `index` and return their currents"""
+        drive = self.k1[index] / (1.0 + np.exp((self.v_th[index] - V[self.pre[index]])
+                                               / self.v_slope[index]))
+        rate = drive + self.k2[index]
+        m_inf = drive / rate
+        m = m_inf + (self.m[index] - m_inf) * np.exp(-rate * dt)
+        self.m[index] = m
+        return self.g[index] * m * (self.e_syn[index] - v_post)
+
+    def step(self, dt):
+        """Update every activation and inject the summed postsynaptic currents"""
+        V = read_voltages(self.neurons)
+        currents = self._advance(V, V[self.post], float(dt))
+        self.I = np.bincount(self.post, weights=currents,
+                             minlength=self.n_neurons).astype(self.m.dtype, copy=False)
+        inject_currents(self.neurons, self.I)
+
+
+class ExponentialSynapses:
+    """
+    Chemical synapses with delays and exponential conductances, event driven.
+
+    Every synapse of `connections` (see connectivity.connect) has a weight,
+    a delay and a receptor type. A presynaptic spike is written once into a
+    ring buffer, at the slot of the step it arrives for each of its
+    synapses; the conductances are summed per postsynaptic neuron and
+    receptor, so each target keeps one state per receptor however many
+    synapses converge on it:
+
+        g_r <- g_r * exp(-dt / tau_r) + (weights arriving this step)
+        I   = sum_r g_r * (e_r - V)        (I = sum_r g_r if e_r is None)
+
+    A step costs O(n_receptors * n_post) and a spike O(fan-out), instead of
+    one update per synapse and step. Delays are rounded to whole steps of
+    at least one step.
+
+    Parameters:
+        neurons: Postsynaptic neurons, a list of neun_py neurons or a
+            vectorized population with connections.n_post members
+        connections (Connections): Synapses, indexed by presynaptic neuron
+        dt (float): Time step, fixed because delays are stored in steps
+        receptors (dict): Name -> (tau_syn, e_syn); e_syn None gives a
+            current-based receptor (default: {'exc': (5.0, 0.0)})
+        receptor: Receptor name of all synapses, or an array with one name
+            or receptor index per synapse (default: the first receptor)
+
+    Spikes are pushed after the neurons step, so a spike of step k with a
+    delay of d steps acts from step k + d:
+
+        syn = ExponentialSynapses(neurons, conn, dt, {'exc': (5.0, 0.0),
+                                                      'inh': (8.0, -80.0)},
+                                  receptor=np.where(inhibitory[conn.sources], 1, 0))
+        for k in range(n_steps):
+            syn.step(dt)                 # before stepping the neurons
+            ...                          # step neurons, detect spikes
+            syn.push(spikes)
+    """
+
+    def __init__(self, neurons, connections, dt, receptors=None, receptor=None):
+        self.neurons = neurons
+        self.n_neurons = len(neurons) if not _is_population(neurons) else neurons.size
+        if connections.n_post != self.n_neurons:
+            raise ValueError(f"Connections target {connections.n_post} neurons, "
+                             f"got {self.n_neurons}")
+        receptors = receptors or {'exc': (5.0, 0.0)}
+        self.receptors = list(receptors)
+        tau = np.array([tau for tau, _ in receptors.values()], dtype=float)
+        self.dt = float(dt)
+        self._decay = np.exp(-self.dt / tau)[:, np.newaxis]
+        self._e_syn = [e_syn for _, e_syn in receptors.values()]
+
+        if receptor is None:
+            receptor = 0
+        receptor = np.asarray(receptor)
+        if receptor.dtype.kind in 'US':
+            names, inverse = np.unique(receptor, return_inverse=True)
+            receptor = np.array([self.receptors.index(name) for name in names])[inverse]
+        receptor = np.broadcast_to(receptor, connections.targets.shape).astype(np.intp)
+
+        self.connections = connections
+        self.delay_steps = np.maximum(np.rint(connections.delays / self.dt), 1).astype(np.intp)
+        self.n_slots = int(self.delay_steps.max(initial=1)) + 1
+        self.weights = np.asarray(connections.weights, dtype=float)
+        # Index of every synapse's (receptor, target) within a buffer slot
+        self._key = receptor * self.n_neurons + connections.targets
+        self._buffer = np.zeros((self.n_slots, len(self.receptors), self.n_neurons))
+        self.g = np.zeros((len(self.receptors), self.n_neurons))
+        self.I = np.zeros(self.n_neurons)
+        self.n_steps = 0
+
+    def __len__(self):
+        return len(self.connections)
+
+    def conductance(self, name):
+        """Summed conductance of receptor `name` onto every neuron"""
+        return self.g[self.receptors.index(name)]
+
+    def push(self, spikes):
+        """Schedule the spikes of the last step (indices or a boolean mask of presynaptic neurons)"""
+        positions = segments(self.connections.indptr, spike_indices(spikes))
+        if not len(positions):
+            return
+        slots = (self.n_steps - 1 + self.delay_steps[positions]) % self.n_slots
+        flat = slots * self.g.size + self._key[positions]
+        np.add.at(self._buffer.reshape(-1), flat, self.weights[positions])
+
+    def step(self, dt=None):
+        """Decay the conductances, add the arriving spikes and inject the currents"""
+        slot = self._buffer[self.n_steps % self.n_slots]
+        self.g *= self._decay
+        self.g += slot
+        slot[:] = 0.0
+        self.n_steps += 1
+
+        V = None
+        self.I = np.zeros(self.n_neurons)
+        for g, e_syn in zip(self.g, self._e_syn):
+            if e_syn is None:
+                self.I += g
+                continue
+            if V is None:
+                V = read_voltages(self.neurons)
+            self.I += g * (e_syn - V)
+        inject_currents(self.neurons, self.I.astype(_target_dtype(self.neurons), copy=False))
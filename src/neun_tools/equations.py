@@ -0,0 +1,84 @@
+"""
+Right-hand sides of the neuron models, written for NumPy arrays
+Each function takes a (n_variables, ...) state array, a {name: value}
+parameter dict and the input current, and returns the time derivatives
+"""
+import math
+
+import numpy as np
+
+HH_VARIABLES = ('v', 'm', 'h', 'n')
+HR_VARIABLES = ('x', 'y', 'z')
+IZ_VARIABLES = ('v', 'u')
+
+# exp(-(v + 35)/10) and exp(-(v + 55)/10) are exp(-(v + 40)/10) times a constant.
+# Plain Python floats, so float32 arrays are not promoted to float64.
+_EXP_BH = math.exp(0.5)
+_EXP_AN = math.exp(-1.5)
+
+
+def hh_rates(v):
+    """
+    Return the HH rate functions (am, bm, ah, bh, an, bn) at voltages v.
+
+    Classic HH kinetics with rest at -65 mV, as in Neun's
+    HodgkinHuxleyModel. am, bh and an share one exponential; the removable
+    singularities of am (-40 mV) and an (-55 mV) are replaced by their limits.
+    The rates keep the floating-point type of v (float32 or float64).
+    """
+    v = np.asarray(v)
+    if v.dtype.kind != 'f':
+        v = v.astype(float)
+    x_m = v + 40.0
+    x_n = v + 55.0
+    e10 = np.exp(-0.1 * x_m)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        am = 0.1 * x_m / (1.0 - e10)
+        an = 0.01 * x_n / (1.0 - e10 * _EXP_AN)
+    if not (np.all(x_m) and np.all(x_n)):
+        am = np.where(x_m == 0.0, 1.0, am)
+        an = np.where(x_n == 0.0, 0.1, an)
+
+    bm = 4.0 * np.exp(-(v + 65.0) / 18.0)
+    ah = 0.07 * np.exp(-(v + 65.0) / 20.0)
+    bh = 1.0 / (1.0 + e10 * _EXP_BH)
+    bn = 0.125 * np.exp(-(v + 65.0) / 80.0)
+    return am, bm, ah, bh, an, bn
+
+
+def hh_derivatives(state, params, I, rates=hh_rates):
+    """Time derivatives of a (4, N) state array [v, m, h, n]"""
+    v, m, h, n = state
+    am, bm, ah, bh, an, bn = rates(v)
+
+    i_ion = (params['gna'] * m**3 * h * (v - params['vna'])
+             + params['gk'] * n**4 * (v - params['vk'])
+             + params['gl'] * (v - params['vl']))
+
+    d = np.empty_like(state)
+    d[0] = (I - i_ion) / params['cm']
+    d[1] = am * (1.0 - m) - bm * m
+    d[2] = ah * (1.0 - h) - bh * h
+    d[3] = an * (1.0 - n) - bn * n
+    return d
+
+
+def hr_derivatives(state, params, I):
+    """Time derivatives of a Hindmarsh-Rose state [x, y, z] (vh scales time)"""
+    x, y, z = state
+    d = np.empty_like(state)
+    d[0] = y + params['b'] * x**2 - params['a'] * x**3 - z + params['e'] + I
+    d[1] = params['c'] - params['d'] * x**2 - y
+    d[2] = params['mu'] * (-z + params['S'] * (x - params['xr']))
+    d *= params['vh']
+    return d
+
+
+def iz_derivatives(state, params, I):
+    """Time derivatives of an Izhikevich state [v, u] (reset handled by the caller)"""
+    v, u = state
+    d = np.empty_like(state)
+    d[0] = 0.04 * v**2 + 5.0 * v + 140.0 - u + I
+    d[1] = params['a'] * (params['b'] * v - u)
+    return d
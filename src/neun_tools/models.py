@@ -0,0 +1,140 @@
+"""
+Model metadata shared by the neun_tools helpers
+Maps neun_py neuron classes to their variable and parameter enums
+
+neun_py is imported lazily so the NumPy-only parts of neun_tools (vectorized
+populations, analysis) can be used on machines without the Neun bindings.
+"""
+import re
+
+from .equations import (
+    HH_VARIABLES,
+    HR_VARIABLES,
+    IZ_VARIABLES,
+    hh_derivatives,
+    hr_derivatives,
+    iz_derivatives,
+)
+
+# Standard workshop parameters (same values as src/hh-multiple-trials.py)
+HH_PARAMS = {
+    'cm': 1.0 * 7.854e-3,      # Membrane capacitance
+    'vna': 50.0,               # Na reversal potential (mV)
+    'vk': -77.0,               # K reversal potential (mV)
+    'vl': -54.387,             # Leak reversal potential (mV)
+    'gna': 120 * 7.854e-3,     # Na conductance
+    'gk': 36 * 7.854e-3,       # K conductance
+    'gl': 0.3 * 7.854e-3,      # Leak conductance
+}
+
+HH_INITIAL = {'v': -80.0, 'm': 0.1, 'h': 0.01, 'n': 0.7}
+
+# Hindmarsh-Rose set used by the noisy-input / chaotic-regime / cv-isis scripts
+HR_PARAMS = {
+    'e': 0.0, 'mu': 0.006, 'S': 4.0, 'a': 1.0, 'b': 3.0,
+    'c': 1.0, 'd': 5.0, 'xr': -1.6, 'vh': 1.0,
+}
+
+HR_INITIAL = {'x': -0.712841, 'y': -1.93688, 'z': 3.16568}
+
+# Regular spiking Izhikevich cell from src/izhikevich.py
+IZ_PARAMS = {'a': 0.02, 'b': 0.2, 'c': -65.0, 'd': 8.0}
+
+IZ_INITIAL = {'v': -65.0, 'u': 0.2 * -65.0}
+
+# Variable that plays the role of the membrane potential in each model family
+VOLTAGE_VARIABLES = {
+    'HH': 'v',
+    'HR': 'x',
+    'Iz': 'v',
+}
+
+# family -> (variables, derivatives, default params, default initial state, spike threshold)
+MODELS = {
+    'HH': (HH_VARIABLES, hh_derivatives, HH_PARAMS, HH_INITIAL, 0.0),
+    'HR': (HR_VARIABLES, hr_derivatives, HR_PARAMS, HR_INITIAL, 0.0),
+    'Iz': (IZ_VARIABLES, iz_derivatives, IZ_PARAMS, IZ_INITIAL, 30.0),
+}
+
+_MODEL_NAME = re.compile(r'^(HH|HR|Iz)(Double|Float)')
+
+# Synapse classes are named after their kind, both model families and the
+# precision (ESynHHHHDoubleRK4); their enums after kind and precision
+_SYNAPSE_NAME = re.compile(r'^(ESyn|DSyn)(?:HH|HR|Iz){2}(Double|Float)')
+
+
+def _split_name(neuron):
+    """Return (family, precision) parsed from a neun_py neuron class name"""
+    name = type(neuron).__name__
+    match = _MODEL_NAME.match(name)
+    if match is None:
+        raise TypeError(f"Unsupported neuron model: {name}")
+    return match.group(1), match.group(2)
+
+
+def model_family(neuron):
+    """Return 'HH', 'HR' or 'Iz' for a neun_py neuron instance"""
+    return _split_name(neuron)[0]
+
+
+def is_synapse(obj):
+    """True for neun_py synapse instances (ESyn..., DSyn...)"""
+    return _SYNAPSE_NAME.match(type(obj).__name__) is not None
+
+
+def _enum_prefix(obj):
+    """'HHDouble', 'ESynDouble', ... for a neun_py neuron or synapse"""
+    match = _SYNAPSE_NAME.match(type(obj).__name__)
+    if match is not None:
+        return match.group(1) + match.group(2)
+    return ''.join(_split_name(obj))
+
+
+def _enum(obj, kind):
+    """neun_py enum '<prefix><kind>' of a neuron or synapse"""
+    import neun_py
+    name = f"{_enum_prefix(obj)}{kind}"
+    enum = getattr(neun_py, name, None)
+    if enum is None:
+        # e.g. DSyn* classes, whose constants are not exposed by the bindings
+        raise TypeError(f"neun_py has no {name} enum, so the {kind.lower()}s of "
+                        f"{type(obj).__name__} cannot be read or written")
+    return enum
+
+
+def variable_enum(neuron):
+    """Return the Variable enum of a neuron or synapse, e.g. neun_py.HHDoubleVariable"""
+    return _enum(neuron, 'Variable')
+
+
+def parameter_enum(neuron):
+    """Return the Parameter enum of a neuron or synapse, e.g. neun_py.HHDoubleParameter"""
+    return _enum(neuron, 'Parameter')
+
+
+def voltage_variable(neuron):
+    """Return the enum member holding the membrane potential of a neuron"""
+    return getattr(variable_enum(neuron), VOLTAGE_VARIABLES[model_family(neuron)])
+
+
+def set_params(neuron, params):
+    """Set neuron parameters from a {name: value} dictionary"""
+    P = parameter_enum(neuron)
+    for name, value in params.items():
+        neuron.set_param(getattr(P, name), value)
+
+
+def set_state(neuron, state):
+    """Set neuron variables from a {name: value} dictionary"""
+    V = variable_enum(neuron)
+    for name, value in state.items():
+        neuron.set(getattr(V, name), value)
+
+
+def create_hh_neuron(params=None, initial=None):
+    """Create an HHDoubleRK4 with HH_PARAMS/HH_INITIAL, overridden by the given dicts"""
+    import neun_py
+    neuron = neun_py.HHDoubleRK4(neun_py.HHDoubleConstructorArgs())
+    set_params(neuron, {**HH_PARAMS, **(params or {})})
+    set_state(neuron, {**HH_INITIAL, **(initial or {})})
+    return neuron
@@ -0,0 +1,298 @@
+"""
+Declarative networks compiled into flat arrays
+A NetworkSpec lists populations and connection rules; compile() turns it
+into one vectorized engine per model, one bank per synapse type and a fixed
+synapses-then-neurons schedule (see step-order.qmd)
+"""
+from functools import partial
+
+import numpy as np
+import scipy.sparse as sp
+
+from .coupling import GapJunctions, SigmoidSynapses
+from .hh_population import HHPopulation
+from .noise import stream_generators
+from .population import Population
+
+# Vectorized engine of each model family that a network can contain
+ENGINES = {
+    'HH': HHPopulation,
+    'HR': partial(Population, 'HR'),
+    'Iz': partial(Population, 'Iz'),
+}
+
+SYNAPSES = ('electrical', 'sigmoid')
+
+# Defaults filled in when only some sigmoid connections set a parameter
+_SIGMOID_DEFAULTS = {
+    'g': 0.002, 'e_syn': 0.0, 'v_th': -20.0, 'v_slope': 5.0, 'k1': 1.0, 'k2': 0.1, 'm0': 0.0,
+}
+
+# Per-synapse parameters accepted by each synapse type
+_SYNAPSE_PARAMS = {
+    'electrical': ('g1', 'g2'),
+    'sigmoid': tuple(_SIGMOID_DEFAULTS),
+}
+
+
+def _draw(value, rng, size):
+    """Scalar, array of length size, or rng-driven callable f(rng, size)"""
+    if callable(value):
+        return np.asarray(value(rng, size), dtype=float)
+    return value
+
+
+def _per_synapse(key, value, n):
+    """Scalar or array of parameter `key` as one value per synapse"""
+    value = np.asarray(value, dtype=float)
+    if value.ndim and value.shape != (n,):
+        raise ValueError(f"Parameter '{key}' has shape {value.shape}, "
+                         f"expected one value per synapse ({n},)")
+    return np.broadcast_to(value, (n,))
+
+
+def _rule_pairs(rule, n_pre, n_post, same, rng):
+    """Local (pre, post) index arrays of a connection rule"""
+    if hasattr(rule, 'pairs'):
+        return rule.pairs(n_pre, n_post, rng, same)
+    if isinstance(rule, tuple):
+        pre, post = (np.asarray(index, dtype=np.intp) for index in rule)
+        return pre, post
+    if rule == 'one_to_one':
+        if n_pre != n_post:
+            raise ValueError("one_to_one needs populations of the same size")
+        index = np.arange(n_pre)
+        return index, index
+    if rule == 'all_to_all':
+        pre = np.repeat(np.arange(n_pre), n_post)
+        post = np.tile(np.arange(n_post), n_pre)
+        if same:
+            distinct = pre != post
+            pre, post = pre[distinct], post[distinct]
+        return pre, post
+    raise ValueError(f"Unknown connection rule: {rule!r}")
+
+
+class NetworkSpec:
+    """
+    Declarative description of a network.
+
+    Example (population-rate.py):
+        spec = NetworkSpec()
+        spec.population('hh', 10, initial={'v': lambda rng, n: -65 + 3 * rng.standard_normal(n),
+                                           'm': 0.05, 'h': 0.6, 'n': 0.3}, I_ext=0.1)
+        spec.connect('hh', 'hh', 'all_to_all', synapse='electrical', g1=-0.0005)
+        net = spec.compile(seed=42)
+        V = net.run(dt=0.001, n_steps=200000)
+
+    Parameter and initial values can be scalars, arrays with one value per
+    neuron (or per synapse), or callables f(rng, n) drawing n values from
+    the NumPy Generator of that population or connection.
+    """
+
+    def __init__(self):
+        self.populations = {}
+        self.connections = []
+
+    def population(self, name, size, model='HH', params=None, initial=None, I_ext=0.0):
+        """Add `size` neurons of `model` ('HH', 'HR' or 'Iz') with a constant input current"""
+        if model not in ENGINES:
+            raise ValueError(f"Unsupported model '{model}', expected one of {list(ENGINES)}")
+        if name in self.populations:
+            raise ValueError(f"Population '{name}' already exists")
+        self.populations[name] = {'size': int(size), 'model': model, 'params': params or {},
+                                  'initial': initial or {}, 'I_ext': I_ext}
+        return self
+
+    def connect(self, pre, post, rule='all_to_all', synapse='electrical', **params):
+        """
+        Connect population `pre` to `post`.
+
+        Parameters:
+            pre, post (str): Population names
+            rule: 'all_to_all' (without self-connections within a
+                population), 'one_to_one', a random rule of connectivity
+                (FixedProbability, FixedInDegree, FixedTotalNumber) drawn
+                from the connection's Generator, or a (pre_indices,
+                post_indices) tuple of local neuron indices. Electrical
+                synapses are symmetric: within a population, all_to_all
+                gives one junction per pair i < j, as with one ESyn per
+                pair, and each pair of a tuple is one junction. Random
+                rules draw directed pairs and cannot make electrical
+                synapses within a population.
+            synapse (str): 'electrical' (ESyn convention, parameters g1 and g2,
+                g2 defaults to g1) or 'sigmoid' (parameters of
+                SigmoidSynapses)
+
+        Parameter arrays need one value per synapse in rule order; for
+        electrical all_to_all within a population of n neurons that is
+        n * (n - 1) / 2 values, one per pair i < j.
+        """
+        if synapse not in SYNAPSES:
+            raise ValueError(f"Unknown synapse '{synapse}', expected one of {SYNAPSES}")
+        for name in (pre, post):
+            if name not in self.populations:
+                raise KeyError(f"Unknown population: {name}")
+        unknown = set(params) - set(_SYNAPSE_PARAMS[synapse])
+        if unknown:
+            raise TypeError(f"Unexpected {synapse} synapse parameters: {sorted(unknown)}")
+        if self.populations[pre]['model'] != self.populations[post]['model']:
+            raise ValueError("Connections between different models are not supported")
+        if synapse == 'electrical' and pre == post and hasattr(rule, 'pairs'):
+            raise ValueError(f"{type(rule).__name__} draws directed pairs and cannot make "
+                             "electrical synapses within a population; draw the pairs "
+                             "with connect() and pass the (pre, post) tuple of the ones "
+                             "to keep")
+        self.connections.append({'pre': pre, 'post': post, 'rule': rule,
+                                 'synapse': synapse, 'params': params})
+        return self
+
+    def compile(self, seed=None, dtype=np.float64, method='rk4'):
+        """Build the Network; seed makes the drawn values reproducible"""
+        return Network(self, seed, dtype, method)
+
+
+class Network:
+    """
+    Compiled network: contiguous state arrays and a fixed update schedule.
+
+    All neurons of a model share one vectorized engine, and populations are
+    contiguous slices of the network's neuron index (grouped by model). All
+    electrical connections form one GapJunctions matrix and all sigmoid
+    connections one SigmoidSynapses bank per model. step() runs the
+    schedule (every synapse bank, then the external input, then every
+    engine), so a step costs a handful of NumPy calls however many neurons
+    and synapses the network has.
+
+    Attributes:
+        engines (dict): Model -> vectorized population
+        slices (dict): Population name -> slice of the network's neurons
+        synapses (list): Synapse banks, in schedule order
+        schedule (tuple): Step functions called in order by step(dt)
+    """
+
+    def __init__(self, spec, seed=None, dtype=np.float64, method='rk4'):
+        if seed is None:
+            seed = np.random.SeedSequence().entropy
+        names = list(spec.populations)
+        rngs = stream_generators(seed, range(len(names) + len(spec.connections)))
+        rng_of = dict(zip(names, rngs))
+
+        # Neurons: populations of the same model are concatenated
+        members = {}
+        for name in names:
+            members.setdefault(spec.populations[name]['model'], []).append(name)
+        self.slices = {}
+        self._local = {}
+        self._offsets = {}
+        offset = 0
+        for model, group in members.items():
+            self._offsets[model] = offset
+            local = 0
+            for name in group:
+                size = spec.populations[name]['size']
+                self.slices[name] = slice(offset + local, offset + local + size)
+                self._local[name] = (model, slice(local, local + size))
+                local += size
+            offset += local
+
+        self.engines = {}
+        self._input = {}
+        for model, group in members.items():
+            size = sum(spec.populations[name]['size'] for name in group)
+            engine = ENGINES[model](size, dtype=dtype, method=method)
+            I_ext = np.zeros(size)
+            for name in group:
+                pop = spec.populations[name]
+                part = self._local[name][1]
+                # Unset entries keep the engine defaults
+                for key, value in pop['params'].items():
+                    engine.params[key][part] = _draw(value, rng_of[name], pop['size'])
+                for key, value in pop['initial'].items():
+                    engine.get(key)[part] = _draw(value, rng_of[name], pop['size'])
+                I_ext[part] = pop['I_ext']
+            self.engines[model] = engine
+            self._input[model] = I_ext.astype(engine.dtype) if I_ext.any() else None
+
+        # Synapses: one bank per (synapse type, model), indices local to the engine
+        groups = {}
+        for c, connection in enumerate(spec.connections):
+            model, pre_part = self._local[connection['pre']]
+            post_part = self._local[connection['post']][1]
+            rng = rngs[len(names) + c]
+            pre, post = _rule_pairs(connection['rule'],
+                                    pre_part.stop - pre_part.start,
+                                    post_part.stop - post_part.start,
+                                    connection['pre'] == connection['post'], rng)
+            if (connection['synapse'] == 'electrical' and connection['rule'] == 'all_to_all'
+                    and connection['pre'] == connection['post']):
+                # One gap junction per pair of neurons, as one ESyn per pair
+                pre, post = pre[pre < post], post[pre < post]
+            params = {key: _per_synapse(key, _draw(value, rng, len(pre)), len(pre))
+                      for key, value in connection['params'].items()}
+            if connection['synapse'] == 'electrical':
+                params.setdefault('g1', np.zeros(len(pre)))
+                params.setdefault('g2', params['g1'])
+            group = groups.setdefault((connection['synapse'], model), [])
+            group.append((pre + pre_part.start, post + post_part.start, params))
+
+        self.synapses = []
+        for (synapse, model), group in groups.items():
+            engine = self.engines[model]
+            pre = np.concatenate([pre for pre, _, _ in group])
+            post = np.concatenate([post for _, post, _ in group])
+            values = {}
+            for key in {key for _, _, params in group for key in params}:
+                default = _SIGMOID_DEFAULTS.get(key, 0.0)
+                values[key] = np.concatenate([params.get(key, np.full(len(p), default))
+                                              for p, _, params in group])
+            if synapse == 'electrical':
+                G = sp.coo_matrix((np.concatenate([values['g1'], values['g2']]),
+                                   (np.concatenate([pre, post]), np.concatenate([post, pre]))),
+                                  shape=(engine.size, engine.size))
+                self.synapses.append(GapJunctions(engine, G.tocsr()))
+            else:
+                self.synapses.append(SigmoidSynapses(engine, pre, post, **values))
+
+        self.schedule = tuple([bank.step for bank in self.synapses]
+                              + [self._inject]
+                              + [engine.step for engine in self.engines.values()])
+
+    @property
+    def size(self):
+        return sum(engine.size for engine in self.engines.values())
+
+    def _inject(self, dt):
+        """Add the constant external currents of every population"""
+        for model, I in self._input.items():
+            if I is not None:
+                self.engines[model].add_synaptic_input(I)
+
+    def step(self, dt):
+        """Advance the whole network by one step"""
+        for stage in self.schedule:
+            stage(dt)
+
+    def get(self, name, variable='v'):
+        """View of `variable` for the neurons of population `name`"""
+        model, part = self._local[name]
+        return self.engines[model].get(variable)[part]
+
+    def run(self, dt, n_steps, variable='v', every=1):
+        """
+        Integrate n_steps and return `variable` every `every` steps.
+
+        Returns:
+            ndarray: (n_samples, size) trace of every neuron, sampled as in
+            Population.run(); select a population with net.slices[name]
+        """
+        out = np.empty((len(range(0, n_steps, every)), self.size),
+                       dtype=np.result_type(*[e.dtype for e in self.engines.values()]))
+        columns = [(engine, slice(self._offsets[model], self._offsets[model] + engine.size))
+                   for model, engine in self.engines.items()]
+        for k in range(n_steps):
+            self.step(dt)
+            if k % every == 0:
+                for engine, part in columns:
+                    out[k // every, part] = engine.get(variable)
+        return out
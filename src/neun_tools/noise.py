@@ -0,0 +1,89 @@
+"""
+Seeded noise currents generated in blocks
+Every trial or neuron draws from its own numpy.random.Generator, derived
+from a SeedSequence, so results do not depend on how work is split
+"""
+import math
+
+import numpy as np
+from scipy.signal import lfilter
+
+
+def stream_generators(seed, channels):
+    """
+    One Generator per channel index, independent of how channels are grouped.
+
+    Channel i always gets SeedSequence(seed, spawn_key=(i,)), the same as
+    the i-th child of SeedSequence(seed).spawn(), so a worker that handles
+    channels 40-59 draws exactly what a serial run would for them.
+    """
+    return [np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(int(i),)))
+            for i in channels]
+
+
+class NoiseInput:
+    """
+    White or Ornstein-Uhlenbeck current noise, produced block by block.
+
+    Parameters:
+        n_steps (int): Total number of samples per channel
+        dt (float): Time step (used by the OU process)
+        mean (float): Mean current
+        sigma (float): Standard deviation of each sample (white noise, as in
+            `I = mean + sigma * np.random.randn()`), or the stationary
+            standard deviation of the OU process
+        tau (float): OU correlation time; None gives white noise
+        channels (int or iterable): Number of channels, or the channel
+            indices handled here (e.g. range(40, 60) in one worker)
+        seed (int): Root seed shared by all channels
+        block_size (int): Samples per block (default: 65536)
+
+    Example:
+        noise = NoiseInput(n_steps, dt, mean=0.1, sigma=0.05, channels=10, seed=42)
+        pop = HHPopulation(10)
+        V = np.concatenate([pop.run(dt, len(block), block) for block in noise.blocks()])
+    """
+
+    def __init__(self, n_steps, dt, mean=0.0, sigma=1.0, tau=None, channels=1,
+                 seed=None, block_size=65536):
+        if isinstance(channels, int):
+            channels = range(channels)
+        if seed is None:
+            seed = np.random.SeedSequence().entropy
+        self.n_steps = int(n_steps)
+        self.dt = dt
+        self.mean = mean
+        self.sigma = sigma
+        self.tau = tau
+        self.channels = list(channels)
+        self.seed = seed
+        self.block_size = int(block_size)
+
+    def blocks(self):
+        """Yield (block_len, n_channels) arrays until n_steps samples are produced"""
+        generators = stream_generators(self.seed, self.channels)
+
+        if self.tau is not None:
+            # Exact OU update x[k] = a x[k-1] + sigma sqrt(1 - a^2) xi[k]
+            a = math.exp(-self.dt / self.tau)
+            b = self.sigma * math.sqrt(1.0 - a * a)
+            # Filter state a * x[-1], with x[-1] from the stationary distribution
+            zi = np.array([[a * self.sigma * gen.standard_normal()] for gen in generators])
+
+        for start in range(0, self.n_steps, self.block_size):
+            length = min(self.block_size, self.n_steps - start)
+            # Channel-major, so each generator fills one contiguous row
+            xi = np.empty((len(generators), length))
+            for row, gen in zip(xi, generators):
+                gen.standard_normal(out=row)
+
+            if self.tau is None:
+                block = self.mean + self.sigma * xi
+            else:
+                x, zi = lfilter([b], [1.0, -a], xi, axis=1, zi=zi)
+                block = self.mean + x
+            yield block.T
+
+    def generate(self):
+        """Whole noise array, (n_steps, n_channels)"""
+        return np.concatenate(list(self.blocks()))
@@ -0,0 +1,165 @@
+"""
+Multi-threaded stepping of compiled networks
+Each thread owns a block of neurons and runs both phases of every step for
+it (synapses, then neurons), with a barrier between the phases
+"""
+import os
+import threading
+
+import numpy as np
+
+from .coupling import GapJunctions, SigmoidSynapses
+
+
+def _blocks(size, n_blocks):
+    """Contiguous, balanced slices covering range(size)"""
+    bounds = np.linspace(0, size, n_blocks + 1).round().astype(int)
+    return [slice(start, stop) for start, stop in zip(bounds[:-1], bounds[1:])]
+
+
+class _Block:
+    """Views of one thread's neurons and of the synapses that target them"""
+
+    def __init__(self, network, model, engine, part, offset):
+        self.engine = engine
+        self.part = part
+        self.columns = slice(offset + part.start, offset + part.stop)
+        self.state = engine.state[:, part]
+        self.input = engine._input[part]
+        I_ext = network._input[model]
+        self.I_ext = None if I_ext is None else I_ext[part]
+
+        self.banks = []
+        for bank in network.synapses:
+            if bank.neurons is not engine:
+                continue
+            if isinstance(bank, GapJunctions):
+                self.banks.append((bank, bank.G[part], bank._row_sums[part]))
+            elif isinstance(bank, SigmoidSynapses):
+                # Synapses onto this block, in bank order (same sums as bincount)
+                mine = np.flatnonzero((bank.post >= part.start) & (bank.post < part.stop))
+                self.banks.append((bank, mine, bank.post[mine] - part.start))
+            else:
+                raise TypeError(f"Unsupported synapse bank: {type(bank).__name__}")
+
+    def synapses(self, dt):
+        """Phase 1: currents onto this block from the voltages at time t"""
+        V = self.engine.get('v')
+        own = V[self.part]
+        for bank, *plan in self.banks:
+            if isinstance(bank, GapJunctions):
+                rows, row_sums = plan
+                I = row_sums * own - rows @ V
+            else:
+                mine, post = plan
+                currents = bank._advance(V, own[post], dt, mine)
+                I = np.bincount(post, weights=currents,
+                                minlength=len(own)).astype(bank.m.dtype, copy=False)
+            bank.I[self.part] = I
+            self.input += I
+        if self.I_ext is not None:
+            self.input += self.I_ext
+
+    def neurons(self, dt):
+        """Phase 2: advance this block and clear its input"""
+        engine = self.engine
+        # Sliced on every step, so set_params() on the engine is picked up
+        params = {name: value[self.part] for name, value in engine.params.items()}
+        engine._integrator(self.state, params, self.input, dt, engine.rates)
+        self.input[:] = 0.0
+
+
+class ThreadedNetwork:
+    """
+    Runs a compiled Network on a pool of threads.
+
+    Every thread owns a contiguous block of each engine's neurons. A step
+    has the two phases of step-order.qmd: each thread computes the synaptic
+    currents onto its block from the voltages at time t, all threads meet
+    at a barrier, then each integrates its block and they meet again before
+    the next step. Phase 1 only reads voltages and phase 2 only writes a
+    thread's own block, so the result is identical to Network.run(). The
+    work is NumPy and sparse matrix kernels, which release the GIL, so
+    large networks use several cores; small ones are faster serially.
+
+    neun_py objects cannot be stepped this way: their synapses add input to
+    neurons owned by other threads, and the bindings hold the GIL.
+
+    Parameters:
+        network (Network): Compiled network (see NetworkSpec)
+        n_threads (int): Number of threads (default: os.cpu_count())
+
+    Example:
+        net = spec.compile(seed=42)
+        V = ThreadedNetwork(net, n_threads=8).run(dt=0.01, n_steps=10000)
+    """
+
+    def __init__(self, network, n_threads=None):
+        self.network = network
+        self.n_threads = n_threads or os.cpu_count() or 1
+        self._thread_blocks = None
+
+    def _plan(self):
+        """Per-thread lists of blocks, one per engine (built on first use)"""
+        if self._thread_blocks is None:
+            plan = [[] for _ in range(self.n_threads)]
+            for model, engine in self.network.engines.items():
+                offset = self.network._offsets[model]
+                for thread, part in enumerate(_blocks(engine.size, self.n_threads)):
+                    plan[thread].append(_Block(self.network, model, engine, part, offset))
+            self._thread_blocks = plan
+        return self._thread_blocks
+
+    def step(self, dt):
+        """
+        Advance the network by one step.
+
+        Every call starts and joins the worker threads, so this is for
+        occasional single steps; loops over steps should call run() once
+        (with variable=None when nothing needs recording).
+        """
+        self.run(dt, 1, variable=None)
+
+    def run(self, dt, n_steps, variable='v', every=1):
+        """
+        Integrate n_steps and return `variable` every `every` steps, as Network.run()
+
+        variable=None skips recording and returns None.
+        """
+        dt = float(dt)
+        net = self.network
+        plan = self._plan()
+        out = None
+        if variable is not None:
+            out = np.empty((len(range(0, n_steps, every)), net.size),
+                           dtype=np.result_type(*[e.dtype for e in net.engines.values()]))
+
+        barrier = threading.Barrier(self.n_threads)
+        errors = []
+
+        def worker(blocks):
+            try:
+                for k in range(n_steps):
+                    for block in blocks:
+                        block.synapses(dt)
+                    barrier.wait()
+                    for block in blocks:
+                        block.neurons(dt)
+                        if out is not None and k % every == 0:
+                            values = block.engine.get(variable)[block.part]
+                            out[k // every, block.columns] = values
+                    barrier.wait()
+            except threading.BrokenBarrierError:
+                pass
+            except Exception as error:
+                errors.append(error)
+                barrier.abort()
+
+        threads = [threading.Thread(target=worker, args=(blocks,)) for blocks in plan]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+        return out
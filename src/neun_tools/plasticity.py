@@ -0,0 +1,136 @@
+"""
+Event-driven spike-timing-dependent plasticity
+Traces are decayed lazily and weights are updated in place only for the
+rows and columns of the neurons that spike
+"""
+import numpy as np
+import scipy.sparse as sp
+
+from ._csr import segments, spike_indices
+
+
+class _Trace:
+    """Exponential spike traces stored as (value, time of value) pairs"""
+
+    def __init__(self, n, tau, accumulate):
+        self.value = np.zeros(n)
+        self.time = np.zeros(n)
+        self.tau = tau
+        self.accumulate = accumulate
+
+    def at(self, t, index=slice(None)):
+        """Trace of neurons `index` at time t"""
+        return self.value[index] * np.exp((self.time[index] - t) / self.tau)
+
+    def spike(self, t, index):
+        value = 1.0
+        if self.accumulate:
+            value += self.at(t, index)
+        self.value[index] = value
+        self.time[index] = t
+
+
+class STDPSynapses:
+    """
+    Bank of plastic synapses with pair-based STDP, dense or sparse.
+
+    With Δt = t_post - t_pre, a pre-before-post pair potentiates by
+    A_plus * exp(-Δt / tau_plus) and a post-before-pre pair depresses by
+    A_minus * exp(Δt / tau_minus), the window of advanced-topics.qmd. Each
+    neuron keeps a trace that jumps to 1 at its spikes (or by 1 with
+    accumulate=True) and decays with the time constant of its side. Traces
+    are stored with the time they were last written and decayed only when
+    read, and a spike only touches its own row (post) or column (pre) of
+    the weights, so the cost grows with spikes x fan-in/out instead of
+    steps x synapses. Weights stay within [w_min, w_max].
+
+    Parameters:
+        W: Initial (n_post, n_pre) weights, a dense array or a scipy sparse
+            matrix (kept as CSR; only its stored entries are plastic)
+        A_plus, A_minus (float): Potentiation and depression amplitudes
+        tau_plus, tau_minus (float): Trace time constants (ms)
+        w_min, w_max (float): Weight bounds
+        accumulate (bool): Add spikes to the traces instead of resetting them
+
+    Example, with lists of neun_py neurons (see src/stdp-training.py):
+        stdp = STDPSynapses(np.full((n_post, n_pre), 0.3))
+        for k in range(n_steps):
+            inject_currents(post, stdp.currents(pre_spikes))
+            ...                              # step neurons, detect spikes
+            stdp.update(k * dt, pre_spikes, post_spikes)
+    """
+
+    def __init__(self, W, A_plus=0.01, A_minus=0.01, tau_plus=20.0, tau_minus=20.0,
+                 w_min=0.0, w_max=1.0, accumulate=False):
+        self.sparse = sp.issparse(W)
+        if self.sparse:
+            W = sp.csr_matrix(W, dtype=float, copy=True)
+            W.sort_indices()
+            self.w = W
+            # Positions of each column's entries in W.data, for presynaptic spikes
+            order = np.argsort(W.indices, kind='stable')
+            self._col_ptr = np.searchsorted(W.indices[order], np.arange(W.shape[1] + 1))
+            self._col_pos = order
+            self._row_of = np.repeat(np.arange(W.shape[0]), np.diff(W.indptr))
+        else:
+            self.w = np.array(W, dtype=float)
+        self.n_post, self.n_pre = self.w.shape
+        self.A_plus = A_plus
+        self.A_minus = A_minus
+        self.w_min = w_min
+        self.w_max = w_max
+        self.trace_pre = _Trace(self.n_pre, tau_plus, accumulate)
+        self.trace_post = _Trace(self.n_post, tau_minus, accumulate)
+
+    def currents(self, pre_spikes):
+        """Summed weights of the spiking presynaptic neurons onto every postsynaptic one"""
+        pre = spike_indices(pre_spikes)
+        if not self.sparse:
+            return self.w[:, pre].sum(axis=1)
+        positions = self._col_pos[segments(self._col_ptr, pre)]
+        return np.bincount(self._row_of[positions], self.w.data[positions],
+                           minlength=self.n_post)
+
+    def update(self, t, pre_spikes, post_spikes):
+        """
+        Apply plasticity for the spikes at time t.
+
+        Postsynaptic spikes potentiate their rows by the presynaptic traces
+        and presynaptic spikes depress their columns by the postsynaptic
+        traces, both read before the spikes of this step are added.
+        """
+        pre = spike_indices(pre_spikes)
+        post = spike_indices(post_spikes)
+        if self.sparse:
+            self._update_sparse(t, pre, post)
+        else:
+            self._update_dense(t, pre, post)
+        self.trace_pre.spike(t, pre)
+        self.trace_post.spike(t, post)
+
+    def _update_dense(self, t, pre, post):
+        # Rows and columns are views, so the weights are updated in place
+        w = self.w
+        if len(post):
+            potentiation = self.A_plus * self.trace_pre.at(t)
+            for i in post:
+                row = w[i]
+                row += potentiation
+                np.clip(row, self.w_min, self.w_max, out=row)
+        if len(pre):
+            depression = self.A_minus * self.trace_post.at(t)
+            for j in pre:
+                column = w[:, j]
+                column -= depression
+                np.clip(column, self.w_min, self.w_max, out=column)
+
+    def _update_sparse(self, t, pre, post):
+        data = self.w.data
+        if len(post):
+            positions = segments(self.w.indptr, post)
+            values = data[positions] + self.A_plus * self.trace_pre.at(t, self.w.indices[positions])
+            data[positions] = np.clip(values, self.w_min, self.w_max)
+        if len(pre):
+            positions = self._col_pos[segments(self._col_ptr, pre)]
+            values = data[positions] - self.A_minus * self.trace_post.at(t, self._row_of[positions])
+            data[positions] = np.clip(values, self.w_min, self.w_max)
@@ -0,0 +1,174 @@
+"""
+Population firing rate from spike times
+Spikes are binned once and smoothed with a boxcar, Gaussian or exponential
+kernel, either for a whole run or incrementally while it runs
+"""
+import math
+
+import numpy as np
+from scipy.signal import lfilter
+
+KERNELS = ('boxcar', 'gaussian', 'exponential')
+
+
+def _spike_times(spikes):
+    """Pooled spike times from an array, a list of arrays or a SpikeTrains"""
+    if hasattr(spikes, 'times'):
+        return spikes.times
+    if isinstance(spikes, (list, tuple)) and len(spikes) and np.ndim(spikes[0]) == 1:
+        return np.concatenate(spikes)
+    return np.asarray(spikes, dtype=float).ravel()
+
+
+class _Kernel:
+    """Smoothing kernel over bins: a window of `left + 1 + right` bins or a filter"""
+
+    def __init__(self, kernel, width, bin_size):
+        if kernel not in KERNELS:
+            raise ValueError(f"kernel must be one of {KERNELS}, got {kernel!r}")
+        self.kind = kernel
+        if kernel == 'boxcar':
+            # Window of `width`, as centred as an integer number of bins allows
+            size = max(int(round(width / bin_size)), 1)
+            self.left, self.right = size // 2, size - 1 - size // 2
+        elif kernel == 'gaussian':
+            # `width` is the standard deviation, truncated at 4 sigma
+            half = max(int(math.ceil(4 * width / bin_size)), 1)
+            x = np.arange(-half, half + 1) * bin_size / width
+            self.weights = np.exp(-0.5 * x * x)
+            self.weights /= self.weights.sum()
+            self.left = self.right = half
+        else:
+            # Causal exponential with time constant `width`, unit area
+            self.decay = math.exp(-bin_size / width)
+            self.left = self.right = 0
+
+    def valid(self, counts):
+        """Smoothed values where the window fits inside `counts`"""
+        if self.kind == 'boxcar':
+            size = self.left + self.right + 1
+            total = np.concatenate([[0.0], np.cumsum(counts)])
+            return (total[size:] - total[:-size]) / size
+        if len(counts) < len(self.weights):
+            return np.empty(0)
+        return np.convolve(counts, self.weights[::-1], mode='valid')
+
+    def exponential(self, counts, zi):
+        """Run the exponential filter over counts, continuing from state zi"""
+        if not len(counts):
+            return counts, zi
+        return lfilter([1.0 - self.decay], [1.0, -self.decay], counts, zi=zi)
+
+
+def population_rate(spikes, n_neurons, t_stop, bin_size=1.0, kernel='boxcar',
+                    width=None, t_start=0.0):
+    """
+    Population firing rate in Hz (spikes per neuron per second, times in ms).
+
+    Spikes are binned with one bincount and then smoothed in O(bins):
+    a sliding boxcar via a cumulative sum, a truncated Gaussian via a
+    convolution and a causal exponential via a recursive filter.
+
+    Parameters:
+        spikes: Pooled spike times, a list of per-neuron arrays or SpikeTrains
+        n_neurons (int): Number of neurons the spikes come from
+        t_stop (float): End of the analysed interval
+        bin_size (float): Bin width (ms)
+        kernel (str): 'boxcar', 'gaussian' or 'exponential'
+        width (float): Boxcar width, Gaussian sigma or exponential time
+            constant (ms); default one bin
+        t_start (float): Start of the analysed interval
+
+    Returns:
+        (ndarray, ndarray): bin centre times and rate
+    """
+    n_bins = int(round((t_stop - t_start) / bin_size))
+    counts = _bin_counts(_bin_index(_spike_times(spikes), t_start, bin_size), 0, n_bins)
+    smoother = _Kernel(kernel, bin_size if width is None else width, bin_size)
+    if smoother.kind == 'exponential':
+        smoothed, _ = smoother.exponential(counts, [0.0])
+    else:
+        padded = np.concatenate([np.zeros(smoother.left), counts, np.zeros(smoother.right)])
+        smoothed = smoother.valid(padded)
+    times = t_start + (np.arange(n_bins) + 0.5) * bin_size
+    return times, smoothed / (n_neurons * bin_size / 1000)
+
+
+def _bin_index(times, t_start, bin_size):
+    return np.floor((times - t_start) / bin_size).astype(np.int64)
+
+
+def _bin_counts(index, first, n_bins):
+    """Spike counts in bins first .. first + n_bins - 1 from their bin indices"""
+    index = index[(index >= first) & (index < first + n_bins)] - first
+    return np.bincount(index, minlength=n_bins).astype(float)
+
+
+class PopulationRate:
+    """
+    Incremental population rate, updated as spike chunks arrive during a run.
+
+    Gives the same values as population_rate() over the whole run. A bin is
+    reported once every spike that can affect it has arrived: immediately
+    for the causal exponential kernel, half a window later for the centred
+    boxcar and Gaussian kernels.
+
+        rate = PopulationRate(n_neurons, bin_size=0.5, kernel='gaussian', width=2)
+        for chunk in range(n_chunks):
+            ...                                    # simulate up to t
+            t_new, r_new = rate.update(new_spike_times, t)
+        t_new, r_new = rate.finish()
+
+    Parameters are those of population_rate().
+    """
+
+    def __init__(self, n_neurons, bin_size=1.0, kernel='boxcar', width=None, t_start=0.0):
+        self.n_neurons = n_neurons
+        self.bin_size = bin_size
+        self.t_start = t_start
+        self.kernel = _Kernel(kernel, bin_size if width is None else width, bin_size)
+        self._scale = 1.0 / (n_neurons * bin_size / 1000)
+        self._pending = np.empty(0, dtype=np.int64)  # bins of unfinished spikes
+        self._counts = np.zeros(self.kernel.left)    # bins still inside a window
+        self._n_binned = 0                           # bins completed so far
+        self._n_reported = 0                         # bins already returned
+        self._zi = [0.0]
+
+    def update(self, spike_times, t):
+        """
+        Add the spikes produced up to time t and return the newly final bins.
+
+        Returns:
+            (ndarray, ndarray): bin centre times and rate of the new bins
+        """
+        n_bins = int(math.floor((t - self.t_start) / self.bin_size + 1e-9))
+        return self._advance(_spike_times(spike_times), n_bins, flush=False)
+
+    def finish(self, t_stop=None):
+        """Close the run at t_stop (default: the last update) and return the remaining bins"""
+        n_bins = self._n_binned
+        if t_stop is not None:
+            n_bins = int(round((t_stop - self.t_start) / self.bin_size))
+        return self._advance(np.empty(0), n_bins, flush=True)
+
+    def _advance(self, spike_times, n_bins, flush):
+        index = np.concatenate([self._pending,
+                                _bin_index(spike_times, self.t_start, self.bin_size)])
+        self._pending = index[index >= n_bins]
+        new = _bin_counts(index, self._n_binned, n_bins - self._n_binned)
+        self._n_binned = n_bins
+
+        if self.kernel.kind == 'exponential':
+            smoothed, self._zi = self.kernel.exponential(new, self._zi)
+        else:
+            self._counts = np.concatenate([self._counts, new])
+            if flush:
+                self._counts = np.concatenate([self._counts, np.zeros(self.kernel.right)])
+            smoothed = self.kernel.valid(self._counts)
+            # Keep the bins the next window still needs
+            self._counts = self._counts[len(smoothed):]
+
+        first = self._n_reported
+        self._n_reported += len(smoothed)
+        times = self.t_start + (np.arange(first, self._n_reported) + 0.5) * self.bin_size
+        return times, smoothed * self._scale
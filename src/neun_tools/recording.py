@@ -0,0 +1,54 @@
+"""
+Preallocated recording of several state variables
+Samples are written into one 2-D float64 array, with optional decimation
+"""
+import numpy as np
+
+
+class Recorder:
+    """
+    Record several variables of a neuron into a preallocated array.
+
+    Parameters:
+        variables (list): Variable enum members to record,
+            e.g. [HHDoubleVariable.v, HHDoubleVariable.m]
+        n_steps (int): Number of steps of the simulation
+        every (int): Keep one sample every `every` steps (default: 1)
+        start (int): First step of the recording window (default: 0)
+        stop (int): End of the recording window, exclusive (default: n_steps)
+
+    Memory is n_samples x n_variables x 8 bytes, where n_samples only
+    depends on the window and the decimation factor.
+
+    Example:
+        V = neun_py.HHDoubleVariable
+        rec = Recorder([V.v, V.m, V.h, V.n], n_steps, every=10)
+        run(neuron, dt, n_steps, 0.1, recorder=rec)
+        plt.plot(rec.times(dt), rec[V.v])
+    """
+
+    def __init__(self, variables, n_steps, every=1, start=0, stop=None):
+        if every < 1:
+            raise ValueError("every must be a positive integer")
+        stop = n_steps if stop is None else min(stop, n_steps)
+
+        self.variables = list(variables)
+        self.steps = np.arange(start, stop, every)
+        self.data = np.empty((len(self.steps), len(self.variables)))
+        self._columns = {var: col for col, var in enumerate(self.variables)}
+
+    def __len__(self):
+        return len(self.steps)
+
+    def __getitem__(self, variable):
+        """Return the recorded samples of one variable"""
+        return self.data[:, self._columns[variable]]
+
+    def store(self, row, neuron):
+        """Write the current state of the neuron into sample `row`"""
+        get = neuron.get
+        self.data[row] = [get(var) for var in self.variables]
+
+    def times(self, dt, t0=0.0):
+        """Return the time of each sample, using the scripts' t = k*dt convention"""
+        return t0 + self.steps * dt
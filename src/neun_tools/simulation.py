@@ -0,0 +1,183 @@
+"""
+Bulk simulation of a single neun_py neuron
+Runs the add_synaptic_input -> step -> get loop in one call
+"""
+import itertools
+
+import numpy as np
+
+from .models import voltage_variable
+from .stimulus import Stimulus
+
+
+def _current_sequence(I_ext, n_steps, dt):
+    """Return the input current as a list of Python floats, or a scalar"""
+    if I_ext is None:
+        return None
+    if isinstance(I_ext, Stimulus):
+        I_ext = I_ext.render(n_steps, dt)
+    if np.ndim(I_ext) == 0:
+        return float(I_ext)
+    I_ext = np.asarray(I_ext, dtype=float)
+    if I_ext.shape != (n_steps,):
+        raise ValueError(f"I_ext has shape {I_ext.shape}, expected ({n_steps},)")
+    # Python floats cross into C++ faster than NumPy scalars
+    return I_ext.tolist()
+
+
+def _advance(neuron, dt, currents, start, stop):
+    """Step the neuron from step `start` to `stop` (exclusive) without recording"""
+    add_input = neuron.add_synaptic_input
+    step = neuron.step
+
+    if currents is None:
+        for _ in range(start, stop):
+            step(dt)
+    elif isinstance(currents, list):
+        for I in currents[start:stop]:
+            add_input(I)
+            step(dt)
+    else:
+        for _ in range(start, stop):
+            add_input(currents)
+            step(dt)
+
+
+def _run_recorder(neuron, dt, n_steps, currents, recorder):
+    """Advance between recorded steps and store only those samples"""
+    k = 0
+    for row, sample_step in enumerate(recorder.steps.tolist()):
+        _advance(neuron, dt, currents, k, sample_step + 1)
+        recorder.store(row, neuron)
+        k = sample_step + 1
+    _advance(neuron, dt, currents, k, n_steps)
+    return recorder.data
+
+
+def run(neuron, dt, n_steps, I_ext=0.0, variable=None, out=None, recorder=None):
+    """
+    Integrate a configured neuron for n_steps and return a recorded trace.
+
+    Equivalent to the per-step loop used in the workshop scripts:
+
+        for k in range(n_steps):
+            neuron.add_synaptic_input(I_ext[k])
+            neuron.step(dt)
+            trace[k] = neuron.get(variable)
+
+    Parameters:
+        neuron: HHDoubleRK4, HRDoubleRK4 or IzDoubleRK4 instance, already
+            configured with parameters and initial conditions
+        dt (float): Integration time step
+        n_steps (int): Number of steps to integrate
+        I_ext (float, array, Stimulus or None): Input current, either constant,
+            one value per step or a Stimulus waveform rendered for the run.
+            None skips add_synaptic_input altogether.
+        variable: Variable enum member to record (default: membrane potential)
+        out (ndarray): Optional preallocated float64 array of length n_steps
+        recorder (Recorder): Record several variables, decimated or within a
+            window, instead of `variable` at every step
+
+    Returns:
+        ndarray: Value of `variable` after each step, or `recorder.data`
+    """
+    n_steps = int(n_steps)
+    if recorder is not None:
+        return _run_recorder(neuron, dt, n_steps,
+                             _current_sequence(I_ext, n_steps, dt), recorder)
+    if variable is None:
+        variable = voltage_variable(neuron)
+    if out is None:
+        out = np.empty(n_steps)
+    elif out.shape != (n_steps,):
+        raise ValueError(f"out has shape {out.shape}, expected ({n_steps},)")
+
+    # Bind methods once: attribute lookups are a large share of a loop step
+    add_input = neuron.add_synaptic_input
+    step = neuron.step
+    get = neuron.get
+    currents = _current_sequence(I_ext, n_steps, dt)
+
+    if currents is None:
+        for k in range(n_steps):
+            step(dt)
+            out[k] = get(variable)
+    elif isinstance(currents, list):
+        for k, I in enumerate(currents):
+            add_input(I)
+            step(dt)
+            out[k] = get(variable)
+    else:
+        for k in range(n_steps):
+            add_input(currents)
+            step(dt)
+            out[k] = get(variable)
+
+    return out
+
+
+def run_spikes(neuron, dt, n_steps, I_ext=0.0, threshold=0.0, hysteresis=0.0,
+               refractory=0.0, interpolate=False, variable=None):
+    """
+    Integrate a neuron and return only its spike times.
+
+    A spike is an upward crossing of `threshold`. After a spike the detector
+    re-arms once the variable falls below threshold - hysteresis, and ignores
+    crossings closer than `refractory` to the previous spike. Memory grows
+    with the number of spikes instead of the number of steps.
+
+    Times follow the scripts' convention: the sample taken after step k is
+    at t = k*dt. With interpolate=True the crossing is located linearly
+    between the two samples that bracket it.
+
+    Parameters:
+        neuron: Configured neun_py neuron
+        dt (float): Integration time step
+        n_steps (int): Number of steps to integrate
+        I_ext (float, array or None): Input current, as in run()
+        threshold (float): Spike threshold (default: 0, as in the HH scripts)
+        hysteresis (float): Re-arming margin below threshold
+        refractory (float): Minimum time between two spikes
+        interpolate (bool): Sub-step interpolation of the crossing time
+        variable: Variable enum member to monitor (default: membrane potential)
+
+    Returns:
+        ndarray: Spike times
+    """
+    n_steps = int(n_steps)
+    if variable is None:
+        variable = voltage_variable(neuron)
+
+    add_input = neuron.add_synaptic_input
+    step = neuron.step
+    get = neuron.get
+    currents = _current_sequence(I_ext, n_steps, dt)
+    if currents is None or isinstance(currents, float):
+        currents = itertools.repeat(currents, n_steps)
+
+    rearm_level = threshold - hysteresis
+    spikes = []
+    last_spike = -np.inf
+    prev = get(variable)
+    armed = prev < threshold
+
+    for k, I in enumerate(currents):
+        if I is not None:
+            add_input(I)
+        step(dt)
+        v = get(variable)
+
+        if armed:
+            if v >= threshold:
+                t = k * dt
+                if interpolate:
+                    t -= dt * (v - threshold) / (v - prev)
+                if t - last_spike >= refractory:
+                    spikes.append(t)
+                    last_spike = t
+                armed = False
+        elif v < rearm_level:
+            armed = True
+        prev = v
+
+    return np.array(spikes)
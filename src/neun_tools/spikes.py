@@ -0,0 +1,174 @@
+"""
+Vectorized spike (peak) detection
+Finds threshold-gated local maxima in a whole batch of traces at once and
+computes ISIs, CV and firing rate per trace
+"""
+import numpy as np
+
+
+def _min_gap(refractory, dt):
+    """Smallest number of samples g with g * dt > refractory"""
+    gap = int(np.floor(refractory / dt)) + 1
+    if (gap - 1) * dt > refractory:
+        gap -= 1
+    return max(gap, 1)
+
+
+def _refractory_merge(keys, row_end, first, gap):
+    """
+    Positions of the peaks that survive the refractory merge.
+
+    A peak is kept if it comes more than the refractory period after the
+    last kept peak of its row. A peak at least `gap` samples after the
+    previous peak is therefore always kept and starts a cluster; inside a
+    cluster the kept peaks are the chain head -> next[head] -> ..., where
+    next[i] is the first peak at least `gap` samples after peak i (it never
+    skips past the next cluster head). All chains are followed together by
+    pointer doubling: after round k the collected set holds the first 2**k
+    members of every chain, so the loop runs log2(peaks per cluster) times
+    instead of once per sample or peak.
+    """
+    n = len(keys)
+    heads = np.ones(n, dtype=bool)
+    heads[1:] = np.diff(keys) >= gap
+    heads[first] = True
+    kept = np.flatnonzero(heads)
+    if len(kept) == n:
+        return kept
+
+    # Chains end (index n) at the row end or at the next cluster head
+    jump = np.searchsorted(keys, keys + gap, side='left')
+    jump[jump >= row_end] = n
+    jump[heads[np.minimum(jump, n - 1)]] = n
+    jump = np.append(jump, n)
+
+    while True:
+        reached = jump[kept]
+        reached = reached[reached < n]
+        if not len(reached):
+            return np.sort(kept)
+        kept = np.concatenate([kept, reached])
+        jump = jump[jump]
+
+
+class SpikeTrains:
+    """
+    Spikes detected in a batch of traces, stored as flat sorted arrays.
+
+    Attributes:
+        rows (ndarray): Trace of each spike
+        indices (ndarray): Sample index of each spike
+        dt (float): Sampling step
+        n_rows (int): Number of traces
+        n_samples (int): Samples per trace
+    """
+
+    def __init__(self, rows, indices, dt, n_rows, n_samples):
+        self.rows = rows
+        self.indices = indices
+        self.dt = dt
+        self.n_rows = n_rows
+        self.n_samples = n_samples
+        self._bounds = np.searchsorted(rows, np.arange(n_rows + 1))
+
+    def __len__(self):
+        return self.n_rows
+
+    def __getitem__(self, row):
+        """Spike times of one trace"""
+        return self.indices_of(row) * self.dt
+
+    def indices_of(self, row):
+        """Sample indices of the spikes of one trace"""
+        return self.indices[self._bounds[row]:self._bounds[row + 1]]
+
+    @property
+    def times(self):
+        return self.indices * self.dt
+
+    @property
+    def duration(self):
+        return self.n_samples * self.dt
+
+    @property
+    def counts(self):
+        """Number of spikes per trace"""
+        return np.diff(self._bounds)
+
+    @property
+    def rate(self):
+        """Spikes per time unit of dt for each trace (x1000 for Hz with ms)"""
+        return self.counts / self.duration
+
+    def _flat_isis(self):
+        """ISIs of all traces, concatenated, and the trace of each"""
+        same_row = self.rows[1:] == self.rows[:-1]
+        return np.diff(self.indices)[same_row] * self.dt, self.rows[1:][same_row]
+
+    @property
+    def isis(self):
+        """List with the inter-spike intervals of each trace"""
+        isis, rows = self._flat_isis()
+        return np.split(isis, np.searchsorted(rows, np.arange(1, self.n_rows)))
+
+    @property
+    def cv(self):
+        """Coefficient of variation of the ISIs per trace (NaN below 2 spikes)"""
+        isis, rows = self._flat_isis()
+        n = np.bincount(rows, minlength=self.n_rows)
+        mean = np.bincount(rows, isis, self.n_rows) / np.maximum(n, 1)
+        var = np.bincount(rows, (isis - mean[rows]) ** 2, self.n_rows) / np.maximum(n, 1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(n > 0, np.sqrt(var) / mean, np.nan)
+
+
+def detect_spikes(V, dt, threshold=0.0, refractory=0.0):
+    """
+    Detect spikes as local maxima above `threshold` in one or many traces.
+
+    Same rule as the loops in cv-isis.py and cpg-analysis.py: sample i is a
+    peak if V[i] > threshold and V[i] is strictly above both neighbours, and
+    it is dropped if it comes within `refractory` (time units) of the last
+    kept peak of its trace.
+
+    Parameters:
+        V (array): (n_samples,) trace or (n_traces, n_samples) batch
+        dt (float): Sampling step
+        threshold (float): Minimum peak value
+        refractory (float): Minimum time between kept peaks (0 keeps all)
+
+    Returns:
+        SpikeTrains
+    """
+    V = np.atleast_2d(V)
+    n_rows, n_samples = V.shape
+    middle = V[:, 1:-1]
+    peaks = (middle > threshold) & (middle > V[:, :-2]) & (middle > V[:, 2:])
+    rows, indices = np.divmod(np.flatnonzero(peaks), n_samples - 2)
+    indices += 1
+
+    if refractory > 0 and len(rows):
+        keys = rows * np.int64(n_samples) + indices
+        bounds = np.searchsorted(rows, np.arange(n_rows + 1))
+        first = bounds[:-1][np.diff(bounds) > 0]
+        keep = _refractory_merge(keys, bounds[rows + 1], first, _min_gap(refractory, dt))
+        rows, indices = rows[keep], indices[keep]
+
+    return SpikeTrains(rows, indices, dt, n_rows, n_samples)
+
+
+def detect_crossings(V, dt, threshold=0.0):
+    """
+    Detect spikes as upward threshold crossings in one or many traces.
+
+    Sample k is a spike if V[k-1] <= threshold < V[k], the rule used by the
+    HH network scripts.
+
+    Returns:
+        SpikeTrains
+    """
+    V = np.atleast_2d(V)
+    n_rows, n_samples = V.shape
+    crossing = (V[:, :-1] <= threshold) & (V[:, 1:] > threshold)
+    rows, indices = np.divmod(np.flatnonzero(crossing), n_samples - 1)
+    return SpikeTrains(rows, indices + 1, dt, n_rows, n_samples)
@@ -0,0 +1,374 @@
+"""
+Composable stimulus waveforms
+Waveforms are rendered in vectorized form, as a whole array or chunk by
+chunk, and can be summed, scaled and windowed
+
+Times follow the workshop scripts: step k is at t = k*dt (time in ms).
+"""
+import numpy as np
+
+from .noise import NoiseInput
+
+
+class Stimulus:
+    """
+    Base class of all waveforms.
+
+    Subclasses implement _values(t), returning the current at the times t.
+    Stimuli combine with +, -, * (by a number) and window():
+
+        I = Constant(1.5) + Sine(1.0, 10) + 3.0 * PulseTrain([50, 100], 5)
+        I_array = I.render(n_steps, dt)
+        V = run(neuron, dt, n_steps, I)      # run() renders it itself
+    """
+
+    def render(self, n_steps, dt, start=0):
+        """Samples for steps start .. start + n_steps - 1"""
+        t = (start + np.arange(n_steps)) * dt
+        return np.broadcast_to(self._values(t), t.shape).astype(float)
+
+    def chunks(self, n_steps, dt, chunk_size=65536):
+        """Lazily yield the rendered samples in chunks of chunk_size steps"""
+        for start in range(0, n_steps, chunk_size):
+            yield self.render(min(chunk_size, n_steps - start), dt, start)
+
+    def window(self, t_start, t_stop):
+        """The same waveform, zero outside [t_start, t_stop)"""
+        return Window(self, t_start, t_stop)
+
+    def _values(self, t):
+        raise NotImplementedError
+
+    def __add__(self, other):
+        return Sum(self, _as_stimulus(other))
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        return Sum(self, Scaled(_as_stimulus(other), -1.0))
+
+    def __rsub__(self, other):
+        return Sum(_as_stimulus(other), Scaled(self, -1.0))
+
+    def __mul__(self, factor):
+        return Scaled(self, float(factor))
+
+    __rmul__ = __mul__
+
+    def __neg__(self):
+        return Scaled(self, -1.0)
+
+
+def _as_stimulus(value):
+    return value if isinstance(value, Stimulus) else Constant(value)
+
+
+class Constant(Stimulus):
+    """Constant current"""
+
+    def __init__(self, value):
+        self.value = float(value)
+
+    def _values(self, t):
+        return np.full(t.shape, self.value)
+
+
+class Sum(Stimulus):
+    """Sum of several waveforms"""
+
+    def __init__(self, *terms):
+        self.terms = terms
+
+    def render(self, n_steps, dt, start=0):
+        # Render each term so stateful terms (Noise) keep their own stream
+        return sum(term.render(n_steps, dt, start) for term in self.terms)
+
+
+class Scaled(Stimulus):
+    """Waveform multiplied by a constant"""
+
+    def __init__(self, stimulus, factor):
+        self.stimulus = stimulus
+        self.factor = factor
+
+    def render(self, n_steps, dt, start=0):
+        return self.factor * self.stimulus.render(n_steps, dt, start)
+
+
+class Window(Stimulus):
+    """Waveform restricted to [t_start, t_stop), zero elsewhere"""
+
+    def __init__(self, stimulus, t_start, t_stop):
+        self.stimulus = stimulus
+        self.t_start = t_start
+        self.t_stop = t_stop
+
+    def render(self, n_steps, dt, start=0):
+        t = (start + np.arange(n_steps)) * dt
+        inside = (t >= self.t_start) & (t < self.t_stop)
+        return np.where(inside, self.stimulus.render(n_steps, dt, start), 0.0)
+
+
+def Step(amplitude, t_start, t_stop):
+    """Step current of `amplitude` in [t_start, t_stop)"""
+    return Constant(amplitude).window(t_start, t_stop)
+
+
+class Ramp(Stimulus):
+    """Linear ramp from I_start at t_start to I_end at t_stop, zero outside"""
+
+    def __init__(self, I_start, I_end, t_start, t_stop):
+        self.I_start = I_start
+        self.I_end = I_end
+        self.t_start = t_start
+        self.t_stop = t_stop
+
+    def _values(self, t):
+        slope = (self.I_end - self.I_start) / (self.t_stop - self.t_start)
+        ramp = self.I_start + slope * (t - self.t_start)
+        return np.where((t >= self.t_start) & (t < self.t_stop), ramp, 0.0)
+
+
+class Sine(Stimulus):
+    """offset + amplitude * sin(2 pi f t / 1000 + phase), f in Hz and t in ms"""
+
+    def __init__(self, amplitude, frequency, offset=0.0, phase=0.0):
+        self.amplitude = amplitude
+        self.frequency = frequency
+        self.offset = offset
+        self.phase = phase
+
+    def _values(self, t):
+        return self.offset + self.amplitude * np.sin(
+            2 * np.pi * self.frequency * t / 1000 + self.phase)
+
+
+class PulseTrain(Stimulus):
+    """
+    Rectangular pulses of `amplitude` starting at each onset, lasting `duration`.
+
+    Equally spaced onsets whose period is a whole number of steps are
+    rendered with index arithmetic: sample k belongs to pulse
+    (k - first) // period_steps and is on while (k - first) % period_steps
+    < width_steps. Other onset lists find each sample's latest onset with a
+    binary search, O(steps log pulses) instead of scanning every pulse.
+    """
+
+    def __init__(self, onsets, duration, amplitude=1.0):
+        self.onsets = np.sort(np.asarray(onsets, dtype=float))
+        self.duration = duration
+        self.amplitude = amplitude
+        gaps = np.diff(self.onsets)
+        regular = len(gaps) and gaps[0] > 0 and np.allclose(gaps, gaps[0], rtol=1e-9, atol=0)
+        self.period = float(gaps[0]) if regular else None
+
+    @classmethod
+    def regular(cls, t_start, period, n_pulses, duration, amplitude=1.0):
+        """n_pulses pulses every `period` from t_start"""
+        return cls(t_start + period * np.arange(n_pulses), duration, amplitude)
+
+    def render(self, n_steps, dt, start=0):
+        period_steps = self._period_steps(dt)
+        if period_steps is None:
+            return super().render(n_steps, dt, start)
+        first = _first_step_at(self.onsets[0], dt)
+        width_steps = _first_step_at(self.onsets[0] + self.duration, dt) - first
+        k = start + np.arange(n_steps) - first
+        # Latest pulse at or before each step (the last one stays latest after the train)
+        pulse = np.minimum(k // period_steps, len(self.onsets) - 1)
+        active = (k >= 0) & (k - pulse * period_steps < width_steps)
+        return np.where(active, float(self.amplitude), 0.0)
+
+    def _period_steps(self, dt):
+        """The period in whole steps of dt, or None if it is not one"""
+        if self.period is None:
+            return None
+        steps = round(self.period / dt)
+        if steps < 1 or abs(self.period / dt - steps) > 1e-9 * steps:
+            return None
+        return steps
+
+    def _values(self, t):
+        latest = np.searchsorted(self.onsets, t, side='right') - 1
+        active = latest >= 0
+        active[active] = t[active] < self.onsets[latest[active]] + self.duration
+        return np.where(active, self.amplitude, 0.0)
+
+
+class Noise(Stimulus):
+    """
+    Seeded white or Ornstein-Uhlenbeck noise (see NoiseInput).
+
+    Noise is generated sequentially: rendering chunks in order continues
+    the same stream, and rendering from step 0 again restarts it, so the
+    samples are the same however the run is chunked.
+    """
+
+    def __init__(self, mean=0.0, sigma=1.0, tau=None, seed=None, channel=0):
+        if seed is None:
+            seed = np.random.SeedSequence().entropy
+        self.mean = mean
+        self.sigma = sigma
+        self.tau = tau
+        self.seed = seed
+        self.channel = channel
+        self._stream = None
+
+    def render(self, n_steps, dt, start=0):
+        if self._stream is None or start != self._position or dt != self._dt:
+            self._restart(dt, start)
+        samples = np.empty(n_steps)
+        filled = 0
+        while filled < n_steps:
+            if len(self._pending) == 0:
+                self._pending = next(self._stream)[:, 0]
+            take = min(n_steps - filled, len(self._pending))
+            samples[filled:filled + take] = self._pending[:take]
+            self._pending = self._pending[take:]
+            filled += take
+        self._position = start + n_steps
+        return samples
+
+    def _restart(self, dt, start):
+        """Start the stream over and skip to step `start`"""
+        noise = NoiseInput(np.iinfo(np.int64).max, dt, self.mean, self.sigma, self.tau,
+                           channels=[self.channel], seed=self.seed)
+        self._stream = noise.blocks()
+        self._pending = np.empty(0)
+        self._position = 0
+        self._dt = dt
+        if start:
+            self.render(start, dt, 0)
+
+
+def _first_step_at(t, dt):
+    """First step k with k * dt >= t, for an array of times"""
+    k = np.ceil(np.asarray(t, dtype=float) / dt).astype(np.int64)
+    k -= (k - 1) * dt >= t
+    k += k * dt < t
+    return np.maximum(k, 0)
+
+
+class PatternSchedule:
+    """
+    Pattern-presentation protocol compiled into sorted event arrays.
+
+    Each presentation drives a set of target neurons with a given amplitude
+    during [onset, onset + duration). compile() turns the presentations into
+    start and stop steps, and currents() walks them with one pointer: the
+    input vector is rebuilt only at steps where a presentation starts or
+    ends, so a step costs O(1) amortized instead of a scan over every
+    pattern. Overlapping presentations add up.
+
+    Example (the training loop of advanced-topics.qmd, pre neurons 0-9 and
+    post neurons 10-14 in one index space):
+        schedule = PatternSchedule(15)
+        schedule.add(pattern_times - 5, 10, [0, 2, 5], 5.0)
+        schedule.add(pattern_times + 5, 10, [11, 13], 3.0)
+        compiled = schedule.compile(dt)
+        for epoch in range(n_epochs):
+            for I in compiled.currents(n_steps):
+                ...
+
+    Parameters:
+        n_neurons (int): Size of the input vector
+    """
+
+    def __init__(self, n_neurons):
+        self.n_neurons = n_neurons
+        self.patterns = []
+
+    def add(self, onsets, duration, targets, amplitude=1.0):
+        """
+        Present one pattern at every onset time.
+
+        Parameters:
+            onsets (array): Start times of the presentations
+            duration (float): Length of each presentation
+            targets (array): Indices of the driven neurons
+            amplitude (float or array): Current, one value or one per target
+        """
+        targets = np.asarray(targets, dtype=np.intp)
+        amplitude = np.broadcast_to(np.asarray(amplitude, dtype=float), targets.shape)
+        self.patterns.append((np.atleast_1d(np.asarray(onsets, dtype=float)),
+                              float(duration), targets, amplitude))
+        return self
+
+    def compile(self, dt):
+        """Step-indexed schedule for time step dt"""
+        return CompiledSchedule(self, dt)
+
+
+class CompiledSchedule:
+    """
+    Step-indexed form of a PatternSchedule (see PatternSchedule.compile).
+
+    Every presentation becomes a start event (+1) and a stop event (-1) of
+    its pattern; the input vector is the number of active presentations of
+    each pattern times the pattern vectors, so it is rebuilt exactly (no
+    accumulated round-off) whenever the counts change.
+
+    Attributes:
+        steps (ndarray): Step of every event, sorted
+        pattern (ndarray): Pattern of every event
+        delta (ndarray): +1 for starts, -1 for stops
+    """
+
+    def __init__(self, schedule, dt):
+        self.n_neurons = schedule.n_neurons
+        self.dt = dt
+        steps, pattern, delta = [], [], []
+        self.vectors = np.zeros((len(schedule.patterns), self.n_neurons))
+        for p, (onsets, duration, targets, amplitude) in enumerate(schedule.patterns):
+            start = _first_step_at(onsets, dt)
+            stop = _first_step_at(onsets + duration, dt)
+            start, stop = start[stop > start], stop[stop > start]
+            steps += [start, stop]
+            pattern.append(np.full(2 * len(start), p))
+            delta += [np.ones(len(start), dtype=np.int64), -np.ones(len(stop), dtype=np.int64)]
+            np.add.at(self.vectors[p], targets, amplitude)
+
+        steps = np.concatenate(steps or [np.empty(0, dtype=np.int64)])
+        order = np.argsort(steps, kind='stable')
+        self.steps = steps[order]
+        self.pattern = np.concatenate(pattern or [np.empty(0, dtype=np.intp)])[order]
+        self.delta = np.concatenate(delta or [np.empty(0, dtype=np.int64)])[order]
+
+    def _counts(self, step):
+        """Active presentations of each pattern at a step"""
+        done = np.searchsorted(self.steps, step, side='right')
+        return np.bincount(self.pattern[:done], self.delta[:done],
+                           minlength=len(self.vectors))
+
+    def at(self, step):
+        """Input vector at one step (random access)"""
+        return self._counts(step) @ self.vectors
+
+    def currents(self, n_steps, start=0, trials=1):
+        """
+        Yield the input vector of steps start .. start + n_steps - 1.
+
+        The same array is yielded until the input changes; treat it as
+        read-only. With trials > 1 it is repeated for a batch laid out as
+        trials consecutive blocks of n_neurons (e.g. an HHPopulation of
+        trials * n_neurons neurons). Iterating again replays the protocol,
+        so one compiled schedule serves every epoch.
+        """
+        steps, pattern, delta = self.steps, self.pattern, self.delta
+        counts = self._counts(start)
+        vector = np.tile(counts @ self.vectors, trials)
+        position = np.searchsorted(steps, start, side='right')
+        for step in range(start, start + n_steps):
+            if position < len(steps) and steps[position] == step:
+                while position < len(steps) and steps[position] == step:
+                    counts[pattern[position]] += delta[position]
+                    position += 1
+                vector = np.tile(counts @ self.vectors, trials)
+            yield vector
+
+    def render(self, n_steps, start=0, trials=1):
+        """(n_steps, trials * n_neurons) array of the inputs, e.g. for HHPopulation.run()"""
+        out = np.empty((n_steps, trials * self.n_neurons))
+        for row, vector in enumerate(self.currents(n_steps, start, trials)):
+            out[row] = vector
+        return out
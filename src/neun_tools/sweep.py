@@ -0,0 +1,108 @@
+"""
+Parallel parameter sweeps
+Spreads grid points over a process pool and collects one metric row per point
+"""
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from .models import create_hh_neuron
+from .simulation import run
+
+
+def parameter_grid(grid):
+    """
+    Expand {name: values} into the list of all parameter combinations.
+
+    Example:
+        parameter_grid({'gna': [100, 120], 'gk': [30, 36]})
+        # [{'gna': 100, 'gk': 30}, {'gna': 100, 'gk': 36}, ...]
+    """
+    names = list(grid)
+    return [dict(zip(names, values))
+            for values in itertools.product(*(grid[name] for name in names))]
+
+
+# -----------------------------
+# Metrics: f(V, dt) -> scalar or dict
+# -----------------------------
+def spike_count(V, dt, threshold=0.0):
+    """Number of upward threshold crossings"""
+    return int(np.sum((V[:-1] < threshold) & (V[1:] >= threshold)))
+
+
+def mean_voltage(V, dt):
+    """Mean of the recorded trace"""
+    return float(np.mean(V))
+
+
+def firing_frequency(V, dt, threshold=0.0):
+    """Firing frequency (Hz, dt in ms) between the first and last spike"""
+    spikes = np.flatnonzero((V[:-1] < threshold) & (V[1:] >= threshold))
+    if len(spikes) < 2:
+        return 0.0
+    return (len(spikes) - 1) / ((spikes[-1] - spikes[0]) * dt / 1000)
+
+
+def _evaluate(params, factory, metrics, dt, n_steps, I_ext):
+    """Simulate one grid point and return its result row"""
+    V = run(factory(params), dt, n_steps, I_ext)
+    row = dict(params)
+    for metric in metrics:
+        value = metric(V, dt)
+        if isinstance(value, dict):
+            row.update(value)
+        else:
+            row[metric.__name__] = value
+    return row
+
+
+def sweep(points, metrics, dt, n_steps, I_ext=0.0, factory=create_hh_neuron,
+          max_workers=None, chunksize=None):
+    """
+    Simulate every parameter point and return a tidy DataFrame.
+
+    Parameters:
+        points (dict or list): {name: values} grid (see parameter_grid) or
+            a list of parameter dicts, e.g. variations of HH_PARAMS
+        metrics (callable or list): f(V, dt) returning a scalar (stored in a
+            column named after the function) or a dict of columns
+        dt (float): Integration time step
+        n_steps (int): Number of steps per simulation
+        I_ext (float or array): Input current passed to run()
+        factory (callable): f(params) -> configured neun_py neuron.
+            Must be a module-level function so it can be pickled.
+        max_workers (int): Worker processes (default: os.cpu_count()).
+            1 runs in the current process.
+        chunksize (int): Points sent to a worker at a time (default: about
+            four chunks per worker)
+
+    Returns:
+        DataFrame: One row per point, parameter columns then metric columns
+
+    Example:
+        df = sweep({'gna': gna_values, 'gk': gk_values},
+                   [spike_count, mean_voltage], dt=0.001, n_steps=100000,
+                   I_ext=0.1)
+    """
+    if isinstance(points, dict):
+        points = parameter_grid(points)
+    if callable(metrics):
+        metrics = [metrics]
+    evaluate = partial(_evaluate, factory=factory, metrics=list(metrics),
+                       dt=dt, n_steps=n_steps, I_ext=I_ext)
+
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1:
+        rows = [evaluate(point) for point in points]
+    else:
+        if chunksize is None:
+            chunksize = max(1, len(points) // (4 * max_workers))
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            rows = list(executor.map(evaluate, points, chunksize=chunksize))
+
+    return pd.DataFrame(rows)
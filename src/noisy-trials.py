@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Trial-to-trial variability with pre-generated noise streams
+Same experiment as hh-multiple-trials.py: every trial has its own seeded
+stream and all trials are integrated together
+"""
+import numpy as np
+
+from neun_tools import HHPopulation, NoiseInput
+
+n_trials = 10
+dt = 0.001
+T = 100
+n_steps = int(round(T / dt))
+
+# I = 0.1 + 0.05 * randn() at every step, one independent stream per trial.
+# Trial i always sees the same samples for a given seed, however the
+# trials are split across runs or workers.
+noise = NoiseInput(n_steps, dt, mean=0.1, sigma=0.05, channels=n_trials, seed=42)
+
+pop = HHPopulation(n_trials)
+all_voltages = np.concatenate([pop.run(dt, len(block), block) for block in noise.blocks()])
+
+mean_voltage = np.mean(all_voltages, axis=1)
+std_voltage = np.std(all_voltages, axis=1)
+
+print(f"Mean voltage at t=50ms: {mean_voltage[int(50/dt)]:.2f} ± {std_voltage[int(50/dt)]:.2f} mV")
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Parallel version of parameter-exploration-batch.py
+Each grid point runs in its own worker process
+"""
+import numpy as np
+
+from neun_tools import mean_voltage, spike_count, sweep
+
+# Same grid as parameter-exploration-batch.py, already scaled
+param_grid = {
+    'gna': np.array([100, 120, 140]) * 7.854e-3,
+    'gk': np.array([30, 36, 42]) * 7.854e-3,
+}
+
+dt = 0.001
+T = 100
+
+if __name__ == '__main__':
+    # Worker processes re-import this script, so the sweep goes under the guard
+    df = sweep(param_grid, [spike_count, mean_voltage],
+               dt=dt, n_steps=int(round(T / dt)), I_ext=0.1)
+    df['gna'] /= 7.854e-3
+    df['gk'] /= 7.854e-3
+    print(df)
@@ -7,6 +7,8 @@ import neun_py
 import matplotlib.pyplot as plt
 import numpy as np
 
+from neun_tools import detect_crossings, population_rate
+
 def create_hh_neuron(v_init=-65):
     """Create and initialize an HH neuron"""
     neuron_args = neun_py.HHDoubleConstructorArgs()
@@ -85,25 +87,10 @@ while time < duration:
 
 # Compute population firing rate using sliding window
 window_size = 5  # ms
-window_samples = int(window_size / step)
-firing_rate = []
-rate_times = []
-
 spike_threshold = 0  # mV
-for i in range(0, len(times) - window_samples, window_samples//2):
-    spike_count = 0
-    window_time = times[i + window_samples//2]
-    
-    for j in range(n_neurons):
-        # Count threshold crossings in window
-        for k in range(i, min(i + window_samples, len(voltages[j]))):
-            if k > 0 and voltages[j][k] > spike_threshold and voltages[j][k-1] <= spike_threshold:
-                spike_count += 1
-    
-    # Convert to firing rate (Hz)
-    rate = (spike_count / n_neurons) / (window_size / 1000)
-    firing_rate.append(rate)
-    rate_times.append(window_time)
+spikes = detect_crossings(np.array(voltages), step, spike_threshold)
+rate_times, firing_rate = population_rate(spikes, n_neurons, duration, bin_size=0.5,
+                                          kernel='boxcar', width=window_size)
 
 # Plot results
 fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(12, 10))
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Rush-Larsen vs RK4 for the Hodgkin-Huxley model
+Spike-time accuracy and cost for several time steps, using RK4 at
+dt = 0.001 ms (the workshop setting) as the reference
+"""
+import time as timer
+
+import numpy as np
+
+from neun_tools import HHPopulation
+
+T = 100  # ms
+currents = np.array([0.05, 0.1, 0.15])  # same inputs as src/hh.py
+
+
+def spike_times(V, dt, threshold=0.0):
+    """Interpolated upward crossings for each column of V"""
+    times = []
+    for v in V.T:
+        k = np.flatnonzero((v[:-1] < threshold) & (v[1:] >= threshold))
+        frac = (threshold - v[k]) / (v[k + 1] - v[k])
+        times.append((k + 1 + frac) * dt)
+    return times
+
+
+def simulate(method, dt):
+    pop = HHPopulation(len(currents), method=method)
+    start = timer.perf_counter()
+    V = pop.run(dt, int(round(T / dt)), currents)
+    return spike_times(V, dt), timer.perf_counter() - start
+
+
+reference, t_ref = simulate('rk4', 0.001)
+print(f"Reference RK4 dt=0.001: {[len(s) for s in reference]} spikes, {t_ref:.2f} s")
+
+for method, dt in [('rk4', 0.01), ('rk4', 0.025), ('rush_larsen', 0.001), ('rush_larsen', 0.01),
+                   ('rush_larsen', 0.025)]:
+    spikes, elapsed = simulate(method, dt)
+    counts = [len(s) for s in spikes]
+    errors = [np.max(np.abs(s[:len(r)] - r[:len(s)])) if len(s) and len(r) else np.nan
+              for s, r in zip(spikes, reference)]
+    print(f"{method:12s} dt={dt:<6}: {counts} spikes, "
+          f"max spike-time error {np.nanmax(errors):.3f} ms, {elapsed:.2f} s")
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+STDP training with neun_py neurons
+The pattern-presentation protocol of advanced-topics.qmd with HH neurons
+and an event-driven STDP bank: plasticity only runs for the neurons that
+spike in a step
+"""
+import numpy as np
+
+from neun_tools import PatternSchedule, STDPSynapses, create_hh_neuron
+from neun_tools.coupling import inject_currents, read_voltages
+
+n_pre = 10
+n_post = 5
+dt = 0.01  # ms
+T = 1000  # ms
+n_steps = int(round(T / dt))
+spike_threshold = 0.0  # mV
+synaptic_gain = 0.5  # current per unit weight for one step after a pre spike
+
+pre_neurons = [create_hh_neuron() for _ in range(n_pre)]
+post_neurons = [create_hh_neuron() for _ in range(n_post)]
+stdp = STDPSynapses(np.full((n_post, n_pre), 0.3))
+
+# Pattern: pre neurons 0, 2, 5 are driven for 5 ms around each pattern time
+# and post neurons 1, 3 ten milliseconds later. Pre and post neurons share
+# one input vector: pre neurons first, then post neurons.
+pattern_times = np.arange(100, T, 200)
+pattern_pre = [0, 2, 5]
+pattern_post = [1, 3]
+schedule = PatternSchedule(n_pre + n_post)
+schedule.add(pattern_times - 5, 10, pattern_pre, 0.5)
+schedule.add(pattern_times + 5, 10, np.add(pattern_post, n_pre), 0.3)
+background = np.full(n_pre + n_post, 0.05)
+
+w_initial = stdp.w.copy()
+V_pre = read_voltages(pre_neurons)
+V_post = read_voltages(post_neurons)
+pre_spikes = np.zeros(n_pre, dtype=bool)
+
+for k, I_pattern in enumerate(schedule.compile(dt).currents(n_steps)):
+    # Background drive plus the pattern currents
+    I = background + I_pattern
+    inject_currents(pre_neurons, I[:n_pre])
+    inject_currents(post_neurons, I[n_pre:] + synaptic_gain * stdp.currents(pre_spikes))
+
+    for neuron in pre_neurons + post_neurons:
+        neuron.step(dt)
+
+    V_pre, V_prev = read_voltages(pre_neurons), V_pre
+    pre_spikes = (V_pre > spike_threshold) & (V_prev <= spike_threshold)
+    V_post, V_prev = read_voltages(post_neurons), V_post
+    post_spikes = (V_post > spike_threshold) & (V_prev <= spike_threshold)
+
+    stdp.update(k * dt, pre_spikes, post_spikes)
+
+print("Weight change (post x pre):")
+print(np.array2string(stdp.w - w_initial, precision=3, suppress_small=True))
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Threaded network stepping
+Runs the same compiled network serially and on several threads; every
+thread computes the synaptic currents onto its own neurons, waits at a
+barrier, then integrates them
+"""
+import os
+import time
+
+import numpy as np
+
+from neun_tools import NetworkSpec, ThreadedNetwork
+
+n_neurons = 50000
+dt = 0.01  # ms
+n_steps = 200
+
+
+def build():
+    spec = NetworkSpec()
+    spec.population('exc', int(0.8 * n_neurons), I_ext=0.1, initial={
+        'v': lambda rng, n: -65 + 3 * rng.standard_normal(n)})
+    spec.population('inh', int(0.2 * n_neurons))
+    # Sparse random excitation onto the inhibitory cells, inhibition back
+    spec.connect('exc', 'inh', (np.arange(n_neurons // 5) * 4, np.arange(n_neurons // 5)),
+                 synapse='sigmoid', g=0.002)
+    spec.connect('inh', 'exc', (np.arange(n_neurons // 5), np.arange(n_neurons // 5) * 4),
+                 synapse='sigmoid', g=0.002, e_syn=-80)
+    return spec.compile(seed=42)
+
+
+net = build()
+start = time.perf_counter()
+V_serial = net.run(dt, n_steps, every=10)
+t_serial = time.perf_counter() - start
+print(f"Serial:    {t_serial:6.2f} s")
+
+for n_threads in sorted({2, 4, os.cpu_count() or 1}):
+    threaded = ThreadedNetwork(build(), n_threads)
+    start = time.perf_counter()
+    V = threaded.run(dt, n_steps, every=10)
+    elapsed = time.perf_counter() - start
+    print(f"{n_threads:2d} threads: {elapsed:6.2f} s  (x{t_serial / elapsed:.1f}, "
+          f"identical: {np.array_equal(V, V_serial)})")
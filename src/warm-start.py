@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Repeated trials forked from a settled state
+The relaxation of the hh-multiple-trials.py neuron to its resting state is
+simulated once (and kept in the warm-start store for later runs); every
+trial starts from a copy of the rest state
+"""
+import numpy as np
+
+from neun_tools import Checkpoint, NoiseInput, WarmStartStore, create_hh_neuron, run
+
+n_trials = 10
+dt = 0.001
+T = 100
+n_steps = int(round(T / dt))
+transient = int(round(50 / dt))
+
+# From v=-80, m=0.1, h=0.01, n=0.7 to rest with no input. With I = 0.1 the
+# cell fires tonically, and the "settled" state would be an arbitrary phase
+# of the spiking cycle
+neuron = create_hh_neuron()
+restored = WarmStartStore().settle(neuron, dt, transient, I_ext=0.0)
+print(f"Settled state {'restored from the store' if restored else 'simulated and stored'}")
+settled = Checkpoint.capture(neuron)
+
+noise = NoiseInput(n_steps, dt, mean=0.1, sigma=0.05, channels=n_trials, seed=42).generate()
+
+all_voltages = np.empty((n_steps, n_trials))
+for trial in range(n_trials):
+    settled.restore(neuron)
+    all_voltages[:, trial] = run(neuron, dt, n_steps, noise[:, trial])
+
+mean_voltage = np.mean(all_voltages, axis=1)
+std_voltage = np.std(all_voltages, axis=1)
+
+print(f"Mean voltage at t=50ms: {mean_voltage[int(50/dt)]:.2f} ± {std_voltage[int(50/dt)]:.2f} mV")
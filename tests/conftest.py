@@ -0,0 +1,5 @@
+import os
+import sys
+
+# neun_tools lives next to the workshop scripts in src/
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, 'src'))
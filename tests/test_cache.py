@@ -0,0 +1,38 @@
+import numpy as np
+
+from neun_tools import SimulationCache, simulation_key
+from neun_tools.stimulus import Constant, Noise, PulseTrain
+
+PARAMS = {'a': 1.0}
+INITIAL = {'x': 0.0}
+
+
+def key(I_ext, dt=0.01, n_steps=1000):
+    return simulation_key('HRDoubleRK4', PARAMS, INITIAL, dt, n_steps, I_ext)
+
+
+def test_stimulus_is_keyed_by_its_samples():
+    stimulus = Constant(2.5) + PulseTrain([2.0, 6.0], 1.0, amplitude=0.5)
+    assert key(stimulus) == key(stimulus.render(1000, 0.01))
+    assert key(stimulus) != key(Constant(2.5))
+    assert key(stimulus) != key(stimulus, n_steps=2000)
+
+
+def test_noise_stimulus_is_keyed_by_its_seed():
+    assert key(Noise(0.0, 1.0, seed=1)) == key(Noise(0.0, 1.0, seed=1))
+    assert key(Noise(0.0, 1.0, seed=1)) != key(Noise(0.0, 1.0, seed=2))
+
+
+def test_get_or_compute_with_stimulus_key(tmp_path):
+    cache = SimulationCache(tmp_path)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {'V': np.arange(5.0)}
+
+    k = key(Constant(2.5).window(1.0, 5.0))
+    first = cache.get_or_compute(k, compute)
+    second = cache.get_or_compute(k, compute)
+    assert len(calls) == 1
+    np.testing.assert_array_equal(first['V'], second['V'])